@@ -0,0 +1,238 @@
+"""
+ACS Classification
+Choropleth class breaks and split geometry/attribute delivery for the enriched TIGER layers
+"""
+
+import gzip
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+import numpy as np
+import orjson
+from fastapi import HTTPException, Request
+from fastapi.responses import Response
+import settings
+from datasets import FEATURE_COLLECTION_FOOTER, FEATURE_COLLECTION_HEADER, FULL_VIEW, Dataset, View, accepts_encoding
+
+CLASS_METHODS = ("quantile", "jenks", "equal")
+
+# Census API annotation values (-666666666 etc.) mark estimates that are not available
+_ANNOTATION_THRESHOLD = -1e8
+
+
+def variable_values(dataset: Dataset, variable: str) -> Tuple[List[str], np.ndarray]:
+    """
+    GEOIDs and numeric values of one ACS variable, NaN where missing.
+
+    Tract and block group estimates are stored as strings, county estimates as
+    floats; both are coerced here.
+
+    Raises:
+        HTTPException 404 if no feature has the variable, 400 if it is not numeric
+    """
+    table = dataset.properties()
+    column = table.column(variable)
+    if column is None:
+        raise HTTPException(status_code=404, detail=f"Unknown ACS variable '{variable}'")
+
+    values, invalid = column.to_float()
+    if invalid and np.isnan(values).all():
+        raise HTTPException(status_code=400, detail=f"ACS variable '{variable}' is not numeric")
+
+    values[values < _ANNOTATION_THRESHOLD] = np.nan
+    geoids = table.column("GEOID")
+    return geoids.take(np.arange(len(table))) if geoids is not None else [None] * len(table), values
+
+
+def quantile_breaks(values: np.ndarray, classes: int) -> np.ndarray:
+    """Class edges holding roughly equal numbers of features."""
+    return np.unique(np.quantile(values, np.linspace(0, 1, classes + 1)))
+
+
+def equal_interval_breaks(values: np.ndarray, classes: int) -> np.ndarray:
+    """Class edges splitting the value range into equal widths."""
+    return np.unique(np.linspace(values.min(), values.max(), classes + 1))
+
+
+def jenks_breaks(values: np.ndarray, classes: int) -> np.ndarray:
+    """
+    Jenks natural breaks (Fisher's exact optimization).
+
+    Dynamic programming over the sorted values, minimizing the summed squared
+    deviation within classes; prefix sums make each class cost O(1).
+    """
+    x = np.sort(values)
+    n = len(x)
+    classes = min(classes, len(np.unique(x)))
+    if classes < 2:
+        return np.unique(x[[0, -1]])
+
+    s1 = np.concatenate([[0.0], np.cumsum(x)])
+    s2 = np.concatenate([[0.0], np.cumsum(x * x)])
+
+    # cost[j, i]: best total deviation of x[:i] in j classes; split[j, i]: start of the last class
+    cost = np.full((classes + 1, n + 1), np.inf)
+    cost[0, 0] = 0.0
+    split = np.zeros((classes + 1, n + 1), dtype=np.int64)
+    for j in range(1, classes + 1):
+        for i in range(j, n + 1):
+            starts = np.arange(j - 1, i)
+            total = s1[i] - s1[starts]
+            deviation = (s2[i] - s2[starts]) - total * total / (i - starts)
+            candidates = cost[j - 1, starts] + deviation
+            best = int(np.argmin(candidates))
+            cost[j, i] = candidates[best]
+            split[j, i] = starts[best]
+
+    lower_bounds = []
+    i = n
+    for j in range(classes, 1, -1):
+        i = split[j, i]
+        lower_bounds.append(x[i])
+    return np.array([x[0], *reversed(lower_bounds), x[-1]])
+
+
+def classify(dataset: Dataset, variable: str, method: str, classes: int) -> Dict:
+    """
+    Classify one ACS variable, memoized per (variable, method, classes) and file version.
+
+    Returns:
+        Dictionary with breaks (class edges), per-class counts and a compact
+        GEOID -> class index map; features without a value are left out
+    """
+    def build():
+        geoids, values = variable_values(dataset, variable)
+        present = ~np.isnan(values)
+        if not present.any():
+            return {"variable": variable, "method": method, "classes": 0,
+                    "breaks": [], "counts": [], "missing": len(geoids), "values": {}}
+
+        compute = {"quantile": quantile_breaks, "jenks": jenks_breaks, "equal": equal_interval_breaks}[method]
+        breaks = compute(values[present], classes)
+        class_count = max(len(breaks) - 1, 1)
+        indexes = np.searchsorted(breaks[1:-1], values[present], side="right")
+
+        return {
+            "variable": variable,
+            "method": method,
+            "classes": class_count,
+            "breaks": breaks.tolist(),
+            "counts": np.bincount(indexes, minlength=class_count).tolist(),
+            "missing": int((~present).sum()),
+            "values": dict(zip(
+                (geoid for geoid, has_value in zip(geoids, present) if has_value),
+                indexes.tolist(),
+            )),
+        }
+
+    return dataset.cached(("classes", variable, method, classes), build)
+
+
+def version(dataset: Dataset) -> str:
+    """Short token of the file version and layer defaults, for ?v= on geometry and column URLs."""
+    return dataset.validators(dataset.make_view())[0][3:15]
+
+
+def _versioned_response(request: Request, dataset: Dataset, requested_version: Optional[str],
+                        build: Callable[[], Tuple[bytes, Optional[bytes]]], media_type: str,
+                        view: View = FULL_VIEW) -> Response:
+    """
+    Serve a body built from one dataset version, with its validators.
+
+    A URL carrying the current ?v= never changes, so it is marked immutable.
+    build() returns (body, gzipped body or None to send it uncompressed) and
+    is skipped for 304 responses.
+    """
+    headers = {**dataset.cache_headers(view), "Vary": "Accept-Encoding"}
+    if requested_version == version(dataset):
+        headers["Cache-Control"] = settings.ACS_IMMUTABLE_CACHE_CONTROL
+
+    if dataset.not_modified(request, view) is not None:
+        return Response(status_code=304, headers=headers)
+
+    body, gzipped = build()
+    if gzipped is not None and accepts_encoding(request, "gzip"):
+        headers["Content-Encoding"] = "gzip"
+        body = gzipped
+    return Response(content=body, media_type=media_type, headers=headers)
+
+
+def geometry_layer(dataset: Dataset, view: View) -> Tuple[bytes, bytes]:
+    """
+    Geometry-only FeatureCollection (identity, gzipped) for a view.
+
+    Feature ids are the 0-based feature positions in the file, the same
+    order /columns arrays use; properties are left empty.
+    """
+    view = view._replace(fields=())
+
+    def build():
+        features = dataset.view_features(view)
+        body = FEATURE_COLLECTION_HEADER + b",".join(
+            orjson.dumps({"type": "Feature", "id": i, "properties": {},
+                          "geometry": orjson.loads(feature).get("geometry")})
+            for i, feature in enumerate(features)
+        ) + FEATURE_COLLECTION_FOOTER
+        return body, gzip.compress(body, compresslevel=settings.GEOJSON_GZIP_LEVEL)
+
+    return dataset.cached_view(("acs_geometry", view), view, build)
+
+
+def geometry_response(request: Request, dataset: Dataset, view: View,
+                      requested_version: Optional[str] = None) -> Response:
+    """Serve geometry_layer(), with long-lived caching for versioned URLs."""
+    return _versioned_response(request, dataset, requested_version,
+                               lambda: geometry_layer(dataset, view), "application/geo+json", view)
+
+
+def column_values(dataset: Dataset, variable: str) -> List:
+    """
+    One attribute as a list aligned to feature order, null where missing.
+
+    ACS estimates (including those stored as strings) are returned as
+    numbers, as integers when every value is whole. TIGER/Line attributes
+    (upper-case names such as GEOID or NAME) and text columns are returned
+    as stored, so identifiers keep their leading zeros.
+
+    Raises:
+        HTTPException 404 if no feature has the attribute
+    """
+    def build():
+        column = dataset.properties().column(variable)
+        if column is None:
+            raise HTTPException(status_code=404, detail=f"Unknown ACS variable '{variable}'")
+
+        if variable.isupper():
+            return column.take(np.arange(len(column)))
+
+        values, invalid = column.to_float()
+        missing = np.isnan(values)
+        if invalid and missing.all():
+            return column.take(np.arange(len(column)))
+
+        missing |= values < _ANNOTATION_THRESHOLD
+        present = values[~missing]
+        if (present == np.round(present)).all() and (np.abs(present) < 2 ** 53).all():
+            values = np.where(missing, 0, values).astype(np.int64)
+        return [None if m else v for v, m in zip(values.tolist(), missing.tolist())]
+
+    return dataset.cached(("acs_column", variable), build)
+
+
+def columns_response(request: Request, dataset: Dataset, level: str, variables: Sequence[str],
+                     requested_version: Optional[str] = None) -> Response:
+    """
+    Serve columnar attribute arrays for a few variables.
+
+    Body: {"level", "version", "count", "columns": {variable: [value per feature id]}}
+    """
+    def build():
+        body = orjson.dumps({
+            "level": level,
+            "version": version(dataset),
+            "count": len(dataset.properties()),
+            "columns": {variable: column_values(dataset, variable) for variable in variables},
+        })
+        if len(body) <= 1024:
+            return body, None
+        return body, gzip.compress(body, compresslevel=settings.GEOJSON_GZIP_LEVEL)
+
+    return _versioned_response(request, dataset, requested_version, build, "application/json")
@@ -0,0 +1,161 @@
+"""
+Area-of-Interest Query
+Features of the ownership, parcel and TIGER layers intersecting a user-drawn polygon
+"""
+
+from typing import Dict, Iterator, List, Tuple
+import numpy as np
+import orjson
+import shapely
+from fastapi import HTTPException
+import settings
+from datasets import Dataset, DatasetRegistry
+from spatial import area_acres
+
+POLYGON_TYPES = ("Polygon", "MultiPolygon")
+
+
+def parse_area(body: bytes) -> Tuple[shapely.Geometry, List[str]]:
+    """
+    Parse a query body: {"geometry": GeoJSON Polygon/MultiPolygon (or a Feature), "layers": [...]}.
+
+    Self-intersecting polygons are repaired rather than rejected.
+
+    Raises:
+        HTTPException 400 for malformed bodies or non-polygon geometries
+    """
+    try:
+        data = orjson.loads(body)
+    except orjson.JSONDecodeError:
+        raise HTTPException(status_code=400, detail="Body must be JSON")
+    if not isinstance(data, dict):
+        raise HTTPException(status_code=400, detail='Body must be {"geometry": ..., "layers": [...]}')
+
+    geometry = data.get("geometry")
+    if isinstance(geometry, dict) and geometry.get("type") == "Feature":
+        geometry = geometry.get("geometry")
+    if not isinstance(geometry, dict) or geometry.get("type") not in POLYGON_TYPES:
+        raise HTTPException(status_code=400, detail="geometry must be a GeoJSON Polygon or MultiPolygon")
+
+    layers = data.get("layers")
+    if not isinstance(layers, list) or not layers or not all(isinstance(name, str) for name in layers):
+        raise HTTPException(status_code=400, detail="layers must be a non-empty list of layer names")
+
+    try:
+        area = shapely.from_geojson(orjson.dumps(geometry))
+    except shapely.errors.GEOSException as e:
+        raise HTTPException(status_code=400, detail=f"Invalid geometry: {e}")
+    if not shapely.is_valid(area):
+        area = shapely.make_valid(area)
+    if shapely.is_empty(area):
+        raise HTTPException(status_code=400, detail="geometry is empty")
+
+    return area, list(dict.fromkeys(layers))
+
+
+def _record(layer: str, properties: bytes, geometry: bytes) -> bytes:
+    """One NDJSON line: {"layer": ..., "feature": Feature}."""
+    return b"".join([
+        b'{"layer":', orjson.dumps(layer),
+        b',"feature":{"type":"Feature","properties":', properties,
+        b',"geometry":', geometry, b"}}\n",
+    ])
+
+
+class AreaQuery:
+    """Intersect an area of interest with any of the served layers."""
+
+    def __init__(self, tiger_layers: DatasetRegistry, ownership: Dataset, parcels: Dataset):
+        self.tiger_layers = tiger_layers
+        self.ownership = ownership
+        self.parcels = parcels
+
+    def layer(self, name: str) -> Dataset:
+        """
+        Dataset for a layer name: ownership, parcels or a TIGER layer.
+
+        Raises:
+            HTTPException 404 for unknown layers or missing files
+        """
+        if name == "ownership":
+            dataset = self.ownership
+        elif name == "parcels":
+            dataset = self.parcels
+        else:
+            dataset = self.tiger_layers.get(name)
+        dataset.size()  # 404 if the file is missing
+        return dataset
+
+    def records(self, area: shapely.Geometry, layers: Dict[str, Dataset],
+                clip: bool = False, acreage: bool = True) -> Iterator[bytes]:
+        """
+        Yield NDJSON: one line per intersecting feature, then a summary line.
+
+        Args:
+            area: Area of interest (WGS84 polygon)
+            layers: Layer name -> dataset, in output order
+            clip: Return geometries clipped to the area, each with its "acres"
+            acreage: Summarize ownership acreage per owner_class within the area
+
+        The summary line is {"summary": {"counts", "area_acres"[, "acres_by_owner_class"]}}.
+        """
+        central_lon = shapely.centroid(area).x
+        summary = {"counts": {}, "area_acres": round(float(area_acres(area, central_lon)), 2)}
+
+        for name, dataset in layers.items():
+            index = dataset.spatial_index()
+            indices = index.intersecting(area)
+            summary["counts"][name] = len(indices)
+            if not len(indices):
+                continue
+
+            properties = dataset.properties()
+            clipped = None
+            if clip or (acreage and name == "ownership"):
+                clipped = shapely.intersection(index.geometries[indices], area)
+
+            if clip:
+                acres = area_acres(clipped, central_lon)
+                geometries = shapely.to_geojson(clipped)
+                lines = (
+                    _record(name, orjson.dumps({**properties[i], "acres": round(float(a), 2)}), g.encode())
+                    for i, a, g in zip(indices.tolist(), acres, geometries)
+                )
+            else:
+                features = dataset.features()
+                lines = (b'{"layer":' + orjson.dumps(name) + b',"feature":' + features[i] + b"}\n"
+                         for i in indices.tolist())
+
+            batch = []
+            for line in lines:
+                batch.append(line)
+                if len(batch) == settings.AREA_QUERY_BATCH_SIZE:
+                    yield b"".join(batch)
+                    batch = []
+            if batch:
+                yield b"".join(batch)
+
+            if acreage and name == "ownership":
+                summary["acres_by_owner_class"] = self._acres_by_owner_class(
+                    properties, indices, clipped, central_lon
+                )
+
+        yield orjson.dumps({"summary": summary}) + b"\n"
+
+    @staticmethod
+    def _acres_by_owner_class(properties, indices: np.ndarray, clipped: np.ndarray,
+                              central_lon: float) -> Dict[str, float]:
+        """
+        Acres of each owner_class inside the area. PAD-US units of one class
+        can overlap (e.g. a designation inside a fee unit), so each class is
+        dissolved before measuring.
+        """
+        column = properties.column("owner_class")
+        classes = column.take(indices) if column is not None else [None] * len(indices)
+        classes = np.array(["unknown" if c is None else c for c in classes], dtype=object)
+
+        result = {}
+        for owner_class in sorted(set(classes)):
+            dissolved = shapely.union_all(clipped[classes == owner_class])
+            result[owner_class] = round(float(area_acres(dissolved, central_lon)), 2)
+        return result
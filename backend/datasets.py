@@ -0,0 +1,689 @@
+"""
+GeoJSON Dataset Cache
+Keeps serialized datasets in memory and rebuilds them when the file changes
+"""
+
+import gzip
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from email.utils import formatdate, parsedate_to_datetime
+from pathlib import Path
+from typing import Callable, Dict, Hashable, Any, Iterator, List, NamedTuple, Optional, Sequence, Tuple
+from fastapi import HTTPException, Request
+from fastapi.responses import Response, StreamingResponse
+import settings
+from io_executor import iterate_io
+from spatial import BBox, SpatialIndex
+from feature_store import FeatureStore, LazySequence
+import numpy as np
+import orjson
+import shapely
+
+try:
+    import brotli
+except ImportError:  # Brotli is optional; gzip is always available
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+FEATURE_COLLECTION_HEADER = b'{"type":"FeatureCollection","features":['
+FEATURE_COLLECTION_FOOTER = b"]}"
+STREAM_READ_SIZE = 1 << 20
+STREAM_CHUNK_SIZE = 64 * 1024
+POLYGONAL_TYPE_IDS = (3, 6)  # shapely type ids for Polygon, MultiPolygon
+STATIC_SIDECARS = {None: "", "gzip": ".gz", "br": ".br"}  # encoding -> file suffix
+# Views, defaults and serialization code can change with a restart, so no
+# response is older than the process that builds it
+STARTED_AT = time.time()
+
+
+class View(NamedTuple):
+    """Which variant of a dataset to serve: LOD tier, coordinate precision and property subset."""
+    tolerance: Optional[float] = None
+    precision: Optional[int] = None
+    fields: Optional[Tuple[str, ...]] = None
+
+
+FULL_VIEW = View()
+
+
+def _round_geometry(geometry: Dict, precision: int):
+    """Round a GeoJSON geometry's coordinates in place."""
+    def round_coords(coords):
+        if coords and isinstance(coords[0], (int, float)):
+            return [round(c, precision) for c in coords]
+        return [round_coords(c) for c in coords]
+
+    if geometry.get("type") == "GeometryCollection":
+        for part in geometry.get("geometries") or []:
+            _round_geometry(part, precision)
+    elif geometry.get("coordinates") is not None:
+        geometry["coordinates"] = round_coords(geometry["coordinates"])
+
+
+def project_feature(feature: bytes, precision: Optional[int], fields: Optional[Tuple[str, ...]]) -> bytes:
+    """Re-serialize a feature with rounded coordinates and only the given properties."""
+    data = orjson.loads(feature)
+    if fields is not None:
+        properties = data.get("properties") or {}
+        data["properties"] = {name: properties[name] for name in fields if name in properties}
+    if precision is not None and data.get("geometry"):
+        _round_geometry(data["geometry"], precision)
+    return orjson.dumps(data)
+
+
+def parse_fields(fields: Optional[str]) -> Optional[Tuple[str, ...]]:
+    """Parse a ?fields= value: comma-separated property names, "*" for all."""
+    if fields is None or fields.strip() == "*":
+        return None
+    names = [name.strip() for name in fields.split(",") if name.strip()]
+    return tuple(dict.fromkeys(names))
+
+
+def lod_tolerance(zoom: Optional[int]) -> Optional[float]:
+    """Simplification tolerance for a map zoom (None: serve full detail)."""
+    if zoom is None:
+        return None
+    for max_zoom, tolerance in sorted(settings.LOD_TOLERANCES.items()):
+        if zoom <= max_zoom:
+            return tolerance
+    return None
+
+
+def _read_file(f) -> Iterator[bytes]:
+    """Read an open binary file in STREAM_READ_SIZE chunks and close it."""
+    with f:
+        yield from iter(lambda: f.read(STREAM_READ_SIZE), b"")
+
+
+def _json_response(request: Request, body: bytes, media_type: str = "application/geo+json") -> Response:
+    """Raw JSON response, gzipped when the client accepts it and it is worth it."""
+    headers = {"Vary": "Accept-Encoding"}
+    if len(body) > 1024 and accepts_encoding(request, "gzip"):
+        body = gzip.compress(body, compresslevel=settings.GEOJSON_GZIP_LEVEL)
+        headers["Content-Encoding"] = "gzip"
+    return Response(content=body, media_type=media_type, headers=headers)
+
+
+def is_fresh(request: Request, etag: str, last_modified: Optional[str] = None) -> bool:
+    """
+    Whether a conditional request's cached copy matches these validators.
+
+    If-None-Match takes precedence over If-Modified-Since (RFC 9110).
+    """
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        tags = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+        return "*" in tags or etag.removeprefix("W/") in tags
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since is not None and last_modified is not None:
+        try:
+            return parsedate_to_datetime(if_modified_since) >= parsedate_to_datetime(last_modified)
+        except (TypeError, ValueError):
+            return False
+    return False
+
+
+def negotiate_encoding(request: Request) -> Optional[str]:
+    """Pick the best precompressed variant the client accepts: "br", "gzip" or None."""
+    if brotli is not None and accepts_encoding(request, "br"):
+        return "br"
+    if accepts_encoding(request, "gzip"):
+        return "gzip"
+    return None
+
+
+def accepts_encoding(request: Request, encoding: str) -> bool:
+    """Check whether the client's Accept-Encoding allows the given encoding."""
+    header = request.headers.get("accept-encoding", "")
+    for part in header.split(","):
+        token, _, params = part.strip().partition(";")
+        if token.strip().lower() != encoding:
+            continue
+        params = params.replace(" ", "")
+        return params not in ("q=0", "q=0.0", "q=0.00", "q=0.000")
+    return False
+
+
+class Dataset:
+    """
+    A GeoJSON or NDJSON file on disk with cached, derived representations.
+
+    Derivatives (serialized bytes, compressed variants, ...) are built once
+    through cached() and kept until the file's mtime or size changes.
+    """
+
+    def __init__(self, path: Path, label: str, name: Optional[str] = None):
+        self.path = path
+        self.label = label
+        self.name = name
+        self._lock = threading.RLock()
+        self._signature = None
+        self._checked_at = 0.0
+        self._cache: Dict[Hashable, Any] = {}
+
+    def _check_signature(self):
+        """
+        Drop cached derivatives if the file changed since they were built.
+
+        The file is stat'ed at most once per DATASET_STAT_INTERVAL seconds, so
+        hot requests are answered without touching the filesystem.
+        """
+        now = time.monotonic()
+        if self._signature is not None and now - self._checked_at < settings.DATASET_STAT_INTERVAL:
+            return
+        self._checked_at = now
+
+        try:
+            stat = self.path.stat()
+        except FileNotFoundError:
+            self._signature = None
+            self._cache = {}
+            raise HTTPException(status_code=404, detail=f"{self.label} not found at {self.path}")
+
+        signature = (stat.st_mtime_ns, stat.st_size)
+        if signature != self._signature:
+            self._signature = signature
+            self._cache = {}
+
+    def size(self) -> int:
+        """Current file size in bytes (404 if the file is missing)."""
+        with self._lock:
+            self._check_signature()
+            return self._signature[1]
+
+    def cached(self, key: Hashable, build: Callable[[], Any]) -> Any:
+        """Return the derivative stored under key, building it on first use."""
+        with self._lock:
+            self._check_signature()
+            if key not in self._cache:
+                self._cache[key] = build()
+            return self._cache[key]
+
+    def is_default_view(self, view: View) -> bool:
+        """Whether view is FULL_VIEW or this layer's default view at any LOD tier."""
+        return view == FULL_VIEW or view._replace(tolerance=None) == self.make_view()
+
+    def cached_view(self, key: Hashable, view: View, build: Callable[[], Any]) -> Any:
+        """
+        cached() for a derivative of one view.
+
+        Default views are kept for the file version like any other derivative.
+        Other views are chosen by clients, so their derivatives share an LRU of
+        DATASET_VIEW_CACHE_ENTRIES per dataset.
+        """
+        if self.is_default_view(view):
+            return self.cached(key, build)
+        with self._lock:
+            self._check_signature()
+            views = self._cache.get("views")
+            if views is not None and key in views:
+                views.move_to_end(key)
+                return views[key]
+            value = build()
+            # build() may have dropped the cache if the file changed meanwhile
+            views = self._cache.setdefault("views", OrderedDict())
+            views[key] = value
+            while len(views) > settings.DATASET_VIEW_CACHE_ENTRIES:
+                views.popitem(last=False)
+            return value
+
+    def _content_digest(self) -> bytes:
+        """Hash the file contents once per file version."""
+        digest = hashlib.blake2b(digest_size=16)
+        with open(self.path, "rb") as f:
+            for chunk in iter(lambda: f.read(STREAM_READ_SIZE), b""):
+                digest.update(chunk)
+        return digest.digest()
+
+    def validators(self, view: View = FULL_VIEW) -> Tuple[str, str]:
+        """
+        (ETag, Last-Modified) of a view of the current file version.
+
+        The ETag covers the file contents, the resolved view (so a change to
+        GEOJSON_LAYER_DEFAULTS changes it) and settings.DATASET_CACHE_VERSION.
+        Last-Modified is never earlier than the server start.
+        """
+        content = self.cached(("content_digest",), self._content_digest)
+        digest = hashlib.blake2b(content, digest_size=16)
+        digest.update(orjson.dumps([settings.DATASET_CACHE_VERSION, *view]))
+        # Weak: the gzip/br/identity encodings of one version share the tag
+        etag = f'W/"{digest.hexdigest()}"'
+        return etag, formatdate(max(self._signature[0] / 1e9, STARTED_AT), usegmt=True)
+
+    def cache_headers(self, view: View = FULL_VIEW) -> Dict[str, str]:
+        """Validator and Cache-Control headers for responses built from a view of this dataset."""
+        etag, last_modified = self.validators(view)
+        return {
+            "ETag": etag,
+            "Last-Modified": last_modified,
+            "Cache-Control": settings.DATASET_CACHE_CONTROL,
+        }
+
+    def not_modified(self, request: Request, view: View = FULL_VIEW) -> Optional[Response]:
+        """
+        304 response if the client's copy of the view is current, else None.
+
+        Answered from the in-memory validators without reading the file.
+        """
+        etag, last_modified = self.validators(view)
+        if is_fresh(request, etag, last_modified):
+            return Response(status_code=304, headers=self.cache_headers(view))
+        return None
+
+    def static_key(self) -> Dict[str, Any]:
+        """What a prebuilt static copy must have been built from to be served."""
+        view = self.make_view()
+        return {
+            "etag": self.validators(view)[0],
+            "precision": view.precision,
+            "fields": list(view.fields) if view.fields is not None else None,
+        }
+
+    def _find_static(self) -> Optional[Dict[Optional[str], Tuple[Path, os.stat_result]]]:
+        """Read the static manifest and stat this dataset's prebuilt files."""
+        try:
+            manifest = orjson.loads((settings.STATIC_DATA_DIR / "manifest.json").read_bytes())
+        except (FileNotFoundError, orjson.JSONDecodeError):
+            return None
+
+        entry = manifest.get(self.name)
+        if entry is None or entry.get("source") != self.static_key():
+            return None
+
+        files = {}
+        for encoding, suffix in STATIC_SIDECARS.items():
+            path = settings.STATIC_DATA_DIR / (entry["file"] + suffix)
+            try:
+                files[encoding] = (path, path.stat())
+            except FileNotFoundError:
+                continue
+        return files if None in files else None
+
+    def static_files(self) -> Optional[Dict[Optional[str], Tuple[Path, os.stat_result]]]:
+        """
+        Prebuilt copies of the default view (from scripts/build_static_data.py)
+        keyed by content encoding, or None when there are none for this file version.
+
+        A miss is retried at most once per DATASET_STAT_INTERVAL.
+        """
+        with self._lock:
+            self._check_signature()
+            checked_at, files = self._cache.get(("static",), (None, None))
+            if files is None and (checked_at is None or
+                                  time.monotonic() - checked_at >= settings.DATASET_STAT_INTERVAL):
+                files = self._find_static()
+                self._cache[("static",)] = (time.monotonic(), files)
+            return files
+
+    def static_response(self, request: Request) -> Optional[StreamingResponse]:
+        """
+        Stream the best prebuilt copy of the default view from disk, if there is one.
+
+        The file is opened here, so a newer build replacing it cannot cut the
+        response short; reads run on the I/O executor. A file that has gone
+        since the manifest was read drops the cached entry, and the caller
+        serves the view dynamically.
+        """
+        files = self.static_files()
+        if files is None:
+            return None
+
+        encoding = next((e for e in ("br", "gzip") if e in files and accepts_encoding(request, e)), None)
+        try:
+            f = open(files[encoding][0], "rb")
+        except FileNotFoundError:
+            with self._lock:
+                self._cache.pop(("static",), None)
+            return None
+        headers = {"Vary": "Accept-Encoding", "Content-Length": str(os.fstat(f.fileno()).st_size)}
+        if encoding:
+            headers["Content-Encoding"] = encoding
+        return StreamingResponse(iterate_io("datasets", _read_file(f)), media_type="application/geo+json",
+                                 headers=headers)
+
+    def _serialize(self) -> bytes:
+        """Serialize the file as a FeatureCollection without decoding features."""
+        if self.path.suffix != ".ndjson":
+            return self.path.read_bytes()
+
+        # NDJSON lines are already serialized features; join them as-is
+        with open(self.path, "rb") as f:
+            lines = [line.strip() for line in f if line.strip()]
+        return FEATURE_COLLECTION_HEADER + b",".join(lines) + FEATURE_COLLECTION_FOOTER
+
+    def make_view(self, zoom: Optional[int] = None, precision: Optional[int] = None,
+                  fields: Optional[str] = None) -> View:
+        """
+        Build the View for request parameters.
+
+        precision and fields fall back to this layer's entry in
+        settings.GEOJSON_LAYER_DEFAULTS. Field names are sorted, and names
+        that are not properties of this dataset are dropped, so equivalent
+        requests share one cached view.
+        """
+        defaults = settings.GEOJSON_LAYER_DEFAULTS.get(self.name, {})
+        if precision is None:
+            precision = defaults.get("precision")
+        if fields is None:
+            field_names = tuple(sorted(defaults["fields"])) if defaults.get("fields") is not None else None
+        else:
+            field_names = parse_fields(fields)
+            if field_names is not None:
+                columns = self.properties().columns
+                field_names = tuple(sorted(name for name in field_names if name in columns))
+        return View(lod_tolerance(zoom), precision, field_names)
+
+    def serialized(self, view: View = FULL_VIEW) -> bytes:
+        """FeatureCollection bytes for a view (the file itself for FULL_VIEW)."""
+        if view == FULL_VIEW:
+            return self.cached("identity", self._serialize)
+        return self.cached_view(
+            ("identity", view), view,
+            lambda: FEATURE_COLLECTION_HEADER + b",".join(self.view_features(view))
+            + FEATURE_COLLECTION_FOOTER
+        )
+
+    def gzipped(self, view: View = FULL_VIEW) -> bytes:
+        """Gzip-compressed FeatureCollection bytes."""
+        return self.cached_view(
+            ("gzip", view), view,
+            lambda: gzip.compress(self.serialized(view), compresslevel=settings.GEOJSON_GZIP_LEVEL)
+        )
+
+    def brotli_compressed(self, view: View = FULL_VIEW) -> bytes:
+        """Brotli-compressed FeatureCollection bytes (requires the brotli package)."""
+        return self.cached_view(
+            ("br", view), view,
+            lambda: brotli.compress(self.serialized(view), quality=settings.GEOJSON_BROTLI_QUALITY)
+        )
+
+    def encoded(self, encoding: Optional[str], view: View = FULL_VIEW) -> bytes:
+        """FeatureCollection bytes for a content encoding from negotiate_encoding()."""
+        if encoding == "br":
+            return self.brotli_compressed(view)
+        if encoding == "gzip":
+            return self.gzipped(view)
+        return self.serialized(view)
+
+    def preload(self):
+        """Build the default view's identity and compressed variants now instead of on first request."""
+        if self.static_files() is not None:
+            return  # served from disk; nothing to hold in memory
+        view = self.make_view()
+        for encoding in (None, "gzip", "br" if brotli is not None else None):
+            self.encoded(encoding, view)
+
+    def iter_features(self) -> Iterator[bytes]:
+        """
+        Yield each feature's serialized JSON without loading the whole file.
+
+        NDJSON lines are passed through; a FeatureCollection file is decoded
+        incrementally so only one feature plus one read buffer is in memory.
+        """
+        if self.path.suffix == ".ndjson":
+            with open(self.path, "rb") as f:
+                for line in f:
+                    line = line.strip()
+                    if line:
+                        yield line
+            return
+
+        decoder = json.JSONDecoder()
+        with open(self.path, "r", encoding="utf-8") as f:
+            buffer = ""
+            eof = False
+
+            def fill():
+                nonlocal buffer, eof
+                chunk = f.read(STREAM_READ_SIZE)
+                eof = not chunk
+                buffer += chunk
+
+            # Advance to the opening bracket of the "features" array
+            while True:
+                key = buffer.find('"features"')
+                start = buffer.find("[", key) if key != -1 else -1
+                if start != -1:
+                    buffer = buffer[start + 1:]
+                    break
+                if eof:
+                    return
+                fill()
+
+            pos = 0
+            while True:
+                while pos < len(buffer) and buffer[pos] in " \t\r\n,":
+                    pos += 1
+                if pos < len(buffer) and buffer[pos] == "]":
+                    return
+                try:
+                    if pos >= len(buffer):
+                        raise ValueError("buffer exhausted")
+                    feature, end = decoder.raw_decode(buffer, pos)
+                except ValueError:
+                    if eof:
+                        raise
+                    buffer = buffer[pos:]
+                    pos = 0
+                    fill()
+                    continue
+                # Re-encode compactly: pretty-printed features would break NDJSON
+                yield orjson.dumps(feature)
+                pos = end
+
+    def store(self) -> FeatureStore:
+        """Columnar copy of the dataset, built once per file version."""
+        return self.cached("store", lambda: FeatureStore(self.iter_features()))
+
+    def features(self) -> Sequence[bytes]:
+        """All features, serialized from the store on access, in file order."""
+        return self.store().features
+
+    def properties(self) -> Sequence[Dict]:
+        """Properties of every feature, decoded from the store's columns on access."""
+        return self.store().properties
+
+    def spatial_index(self) -> SpatialIndex:
+        """STRtree over the dataset, built once per file version."""
+        return self.cached("spatial_index", lambda: SpatialIndex(self.store().geometries()))
+
+    def _build_lod_tiers(self) -> Dict[float, List[bytes]]:
+        """
+        Simplify every feature once per LOD_TOLERANCES tier.
+
+        coverage_simplify simplifies shared edges once for all polygons that
+        use them, so neighbouring boundaries stay aligned at every tier.
+        """
+        geometries = self.spatial_index().geometries
+        polygonal = np.isin(shapely.get_type_id(geometries), POLYGONAL_TYPE_IDS)
+        properties = [orjson.dumps(props) for props in self.properties()]
+
+        tiers = {}
+        for tolerance in settings.LOD_TOLERANCES.values():
+            simplified = geometries.copy()
+            simplified[polygonal] = shapely.coverage_simplify(geometries[polygonal], tolerance)
+            tiers[tolerance] = [
+                feature if geometry is None or not is_polygonal
+                else b'{"type":"Feature","properties":' + props + b',"geometry":'
+                + shapely.to_geojson(geometry).encode("utf-8") + b"}"
+                for feature, props, geometry, is_polygonal
+                in zip(self.features(), properties, simplified, polygonal)
+            ]
+        return tiers
+
+    def lod_features(self, tolerance: Optional[float]) -> Sequence[bytes]:
+        """Serialized features simplified to the given tier (None: full detail)."""
+        if tolerance is None:
+            return self.features()
+        return self.cached("lod_tiers", self._build_lod_tiers)[tolerance]
+
+    def view_features(self, view: View) -> Sequence[bytes]:
+        """
+        Serialized features for a view.
+
+        LOD tiers are projected once and cached; full-detail views are
+        projected on access so no per-feature copy is held in memory.
+        """
+        features = self.lod_features(view.tolerance)
+        if view.precision is None and view.fields is None:
+            return features
+        if view.tolerance is None:
+            store = self.store()
+            return LazySequence(len(store), lambda i: store.feature_bytes(i, view.precision, view.fields))
+        return self.cached_view(
+            ("features", view), view,
+            lambda: [project_feature(f, view.precision, view.fields) for f in features]
+        )
+
+    def bbox_response(self, request: Request, bbox: BBox, limit: Optional[int] = None,
+                      cursor: Optional[int] = None, fmt: str = "geojson",
+                      view: View = FULL_VIEW) -> Response:
+        """
+        Serve only the features intersecting bbox.
+
+        When limit cuts the result short, the FeatureCollection carries a
+        next_cursor member (NDJSON: X-Next-Cursor header) to pass back as ?cursor=.
+        """
+        indices, next_cursor = self.spatial_index().query(bbox, limit, cursor)
+        view_features = self.view_features(view)
+        features = [view_features[i] for i in indices]
+
+        if fmt == "ndjson":
+            response = _json_response(request, b"".join(f + b"\n" for f in features),
+                                      media_type="application/x-ndjson")
+            if next_cursor is not None:
+                response.headers["X-Next-Cursor"] = str(next_cursor)
+            return response
+
+        footer = FEATURE_COLLECTION_FOOTER
+        if next_cursor is not None:
+            footer = b'],"next_cursor":' + str(next_cursor).encode() + b"}"
+        return _json_response(request, FEATURE_COLLECTION_HEADER + b",".join(features) + footer)
+
+    def _stream(self, fmt: str, compress: bool, view: View) -> Iterator[bytes]:
+        """Generate the response body in bounded chunks, optionally gzipping on the fly."""
+        compressor = zlib.compressobj(settings.GEOJSON_GZIP_LEVEL, zlib.DEFLATED, 31) if compress else None
+        pending = []
+        pending_size = 0
+
+        def features():
+            if view.precision is None and view.fields is None:
+                return self.iter_features()
+            return (project_feature(f, view.precision, view.fields) for f in self.iter_features())
+
+        def pieces():
+            if fmt == "ndjson":
+                for feature in features():
+                    yield feature
+                    yield b"\n"
+                return
+
+            yield FEATURE_COLLECTION_HEADER
+            first = True
+            for feature in features():
+                if not first:
+                    yield b","
+                first = False
+                yield feature
+            yield FEATURE_COLLECTION_FOOTER
+
+        for piece in pieces():
+            pending.append(piece)
+            pending_size += len(piece)
+            if pending_size >= STREAM_CHUNK_SIZE:
+                chunk = b"".join(pending)
+                pending, pending_size = [], 0
+                if compressor:
+                    chunk = compressor.compress(chunk)
+                if chunk:
+                    yield chunk
+
+        chunk = b"".join(pending)
+        if compressor:
+            chunk = compressor.compress(chunk) + compressor.flush()
+        if chunk:
+            yield chunk
+
+    def stream_response(self, request: Request, fmt: str = "geojson",
+                        view: View = FULL_VIEW) -> StreamingResponse:
+        """
+        Stream the dataset as a FeatureCollection or newline-delimited features.
+
+        Precision and fields are applied per feature on the fly, on the I/O
+        executor; LOD tiers are never streamed.
+        """
+        self.size()  # 404 before the response starts if the file is missing
+        compress = accepts_encoding(request, "gzip")
+        headers = {"Vary": "Accept-Encoding"}
+        if compress:
+            headers["Content-Encoding"] = "gzip"
+        media_type = "application/x-ndjson" if fmt == "ndjson" else "application/geo+json"
+        return StreamingResponse(iterate_io("datasets", self._stream(fmt, compress, view)),
+                                 media_type=media_type, headers=headers)
+
+    def response(self, request: Request, fmt: str = "geojson",
+                 view: View = FULL_VIEW) -> Response:
+        """
+        Serve the dataset in the requested format.
+
+        FeatureCollections up to GEOJSON_CACHE_MAX_BYTES come from the in-memory
+        cache; larger files and NDJSON are streamed with constant memory.
+        Views with an LOD tier are always served from memory. The default view
+        is streamed from prebuilt static files when they are current.
+        """
+        if fmt == "geojson" and view == self.make_view():
+            static = self.static_response(request)
+            if static is not None:
+                return static
+
+        if view.tolerance is None and (fmt == "ndjson" or self.size() > settings.GEOJSON_CACHE_MAX_BYTES):
+            return self.stream_response(request, fmt, view)
+
+        if fmt == "ndjson":
+            return _json_response(request, b"".join(f + b"\n" for f in self.view_features(view)),
+                                  media_type="application/x-ndjson")
+
+        encoding = negotiate_encoding(request)
+        headers = {"Vary": "Accept-Encoding"}
+        if encoding:
+            headers["Content-Encoding"] = encoding
+        return Response(
+            content=self.encoded(encoding, view),
+            media_type="application/geo+json",
+            headers=headers,
+        )
+
+
+class DatasetRegistry:
+    """Named datasets (e.g. the TIGER layers) served through one route."""
+
+    def __init__(self, directory: Path, layers: Dict[str, str], label: str):
+        self.label = label
+        self.datasets = {
+            name: Dataset(directory / filename, f"{label} layer '{name}'", name)
+            for name, filename in layers.items()
+        }
+
+    def get(self, name: str) -> Dataset:
+        """Look up a layer by name (404 for unknown layers)."""
+        dataset = self.datasets.get(name)
+        if dataset is None:
+            raise HTTPException(status_code=404, detail=f"Unknown {self.label} layer '{name}'")
+        return dataset
+
+    def preload(self):
+        """Load and pre-serialize every layer whose file exists."""
+        for name, dataset in self.datasets.items():
+            if not dataset.path.exists():
+                logger.warning(f"{self.label} layer '{name}' not found at {dataset.path}, skipping preload")
+                continue
+            dataset.preload()
+            logger.info(f"✓ Preloaded {self.label} layer '{name}' ({dataset.size()} bytes)")
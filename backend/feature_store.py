@@ -0,0 +1,382 @@
+"""
+Columnar Feature Store
+Holds a dataset's features as NumPy coordinate arrays and dictionary-encoded property columns
+"""
+
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+import numpy as np
+import orjson
+import shapely
+
+# Column value states (only stored when a column has gaps)
+PRESENT, NULL, ABSENT = 0, 1, 2
+
+GEOMETRY_TYPE_NAMES = {
+    0: "Point", 1: "LineString", 3: "Polygon",
+    4: "MultiPoint", 5: "MultiLineString", 6: "MultiPolygon",
+}
+
+
+def round_coordinates(coords: np.ndarray, precision: int) -> np.ndarray:
+    """
+    Round like Python's round(): np.round scales by 10**precision first, which
+    can tip values just below a half the wrong way, so near-ties are redone exactly.
+    """
+    rounded = np.round(coords, precision)
+    scaled = coords * 10.0 ** precision
+    ties = np.abs(scaled - np.floor(scaled) - 0.5) < 1e-6
+    if ties.any():
+        rounded[ties] = [round(value, precision) for value in coords[ties].tolist()]
+    return rounded
+
+
+class LazySequence(Sequence):
+    """Read-only sequence whose items are produced by a function on access."""
+
+    def __init__(self, length: int, item: Callable[[int], Any]):
+        self._length = length
+        self._item = item
+
+    def __len__(self) -> int:
+        return self._length
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self._item(j) for j in range(*i.indices(self._length))]
+        if i < 0:
+            i += self._length
+        if not 0 <= i < self._length:
+            raise IndexError(i)
+        return self._item(i)
+
+    def __iter__(self):
+        return (self._item(i) for i in range(self._length))
+
+
+class Column:
+    """
+    One property across all features.
+
+    Strings are dictionary-encoded (int32 codes into a category list), ints,
+    floats and bools are NumPy arrays, anything else (mixed types, nested
+    values) stays a Python list. A state array records null/absent values.
+    """
+
+    def __init__(self, values: List[Any], states: np.ndarray):
+        self.state = states if (states != PRESENT).any() else None
+        present = [v for v, s in zip(values, states) if s == PRESENT]
+        kinds = {type(v) for v in present}
+
+        self.categories: Optional[List[str]] = None
+        self.kind = "object"
+        self.data = values
+        if present and kinds <= {str}:  # an all-null column stays "object", with no categories
+            self.kind = "str"
+            categories, codes = np.unique(np.array(present, dtype=str), return_inverse=True)
+            self.categories = categories.tolist()
+            self.data = np.full(len(values), -1, dtype=np.int32)
+            self.data[states == PRESENT] = codes
+        elif kinds in ({int}, {float}, {bool}):
+            kind = next(iter(kinds)).__name__
+            dtype = {"int": np.int64, "float": np.float64, "bool": np.bool_}[kind]
+            try:
+                self.data = np.array([v if s == PRESENT else 0 for v, s in zip(values, states)], dtype=dtype)
+                self.kind = kind
+            except OverflowError:  # ints beyond int64 stay Python objects
+                pass
+
+    def __len__(self) -> int:
+        return len(self.data)
+
+    def is_present(self, i: int) -> bool:
+        return self.state is None or self.state[i] != ABSENT
+
+    def get(self, i: int) -> Any:
+        """Decoded value of feature i (None when null or absent)."""
+        if self.state is not None and self.state[i] != PRESENT:
+            return None
+        if self.kind == "str":
+            return self.categories[self.data[i]]
+        if self.kind == "object":
+            return self.data[i]
+        return self.data[i].item()
+
+    def take(self, indices: np.ndarray) -> List[Any]:
+        """Decoded values for many features; a negative index yields None."""
+        indices = np.asarray(indices)
+        valid = indices >= 0
+        safe = np.where(valid, indices, 0)
+        if self.state is not None:
+            valid &= self.state[safe] == PRESENT
+
+        if self.kind == "str":
+            categories = self.categories
+            values = [categories[c] for c in self.data[safe].tolist()]
+        elif self.kind == "object":
+            values = [self.data[i] for i in safe.tolist()]
+        else:
+            values = self.data[safe].tolist()
+        return [v if ok else None for v, ok in zip(values, valid.tolist())]
+
+    def isin(self, values: Iterable[Any]) -> np.ndarray:
+        """Boolean mask of features whose value is one of values."""
+        values = set(values)
+        if self.kind == "str":
+            codes = [i for i, category in enumerate(self.categories) if category in values]
+            mask = np.isin(self.data, codes)
+        elif self.kind == "object":
+            mask = np.array([value in values for value in self.data], dtype=bool)
+        else:
+            mask = np.isin(self.data, list(values))
+        if self.state is not None:
+            mask &= self.state == PRESENT
+        return mask
+
+    def to_float(self) -> Tuple[np.ndarray, int]:
+        """
+        Values as float64 (NaN where null, absent or unparsable), plus the
+        number of non-null values that could not be parsed as numbers.
+
+        String columns are parsed once per category, not once per feature.
+        """
+        invalid = 0
+        if self.kind == "str":
+            parsed = np.full(len(self.categories), np.nan)
+            for i, category in enumerate(self.categories):
+                try:
+                    parsed[i] = float(category) if category != "" else np.nan
+                except ValueError:
+                    pass
+            # Code -1 (no category) picks the trailing NaN
+            values = np.append(parsed, np.nan)[self.data]
+            bad = np.isnan(parsed) & (np.array(self.categories, dtype=object) != "")
+            invalid = int(bad[self.data[self.data >= 0]].sum())
+        elif self.kind == "object":
+            values = np.full(len(self.data), np.nan)
+            for i, value in enumerate(self.data):
+                if value is None:
+                    continue
+                try:
+                    values[i] = float(value)
+                except (TypeError, ValueError):
+                    invalid += 1
+        else:
+            values = self.data.astype(np.float64)
+
+        if self.state is not None:
+            values = np.where(self.state == PRESENT, values, np.nan)
+        return values, invalid
+
+    @property
+    def nbytes(self) -> int:
+        size = self.data.nbytes if isinstance(self.data, np.ndarray) else 8 * len(self.data)
+        if self.categories is not None:
+            size += sum(len(c) + 49 for c in self.categories)
+        if self.state is not None:
+            size += self.state.nbytes
+        return size
+
+
+class PropertyTable(Sequence):
+    """Columns of feature properties; indexing yields each feature's properties dict."""
+
+    def __init__(self, records: List[Dict], keys: List[str]):
+        self.columns: Dict[str, Column] = {}
+        for key in keys:
+            values = []
+            states = np.empty(len(records), dtype=np.int8)
+            for i, record in enumerate(records):
+                if key not in record:
+                    values.append(None)
+                    states[i] = ABSENT
+                else:
+                    value = record[key]
+                    values.append(value)
+                    states[i] = NULL if value is None else PRESENT
+            self.columns[key] = Column(values, states)
+        self._length = len(records)
+
+    def __len__(self) -> int:
+        return self._length
+
+    def __getitem__(self, i) -> Dict:
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(self._length))]
+        return {
+            name: column.get(i)
+            for name, column in self.columns.items()
+            if column.is_present(i)
+        }
+
+    def __iter__(self):
+        return (self[i] for i in range(self._length))
+
+    def column(self, name: str) -> Optional[Column]:
+        return self.columns.get(name)
+
+    def to_columns(self, mask: Optional[np.ndarray] = None) -> Dict[str, List]:
+        """Decoded columns (optionally only rows where mask is True), e.g. for a DataFrame."""
+        indices = np.arange(self._length) if mask is None else np.flatnonzero(mask)
+        return {name: column.take(indices) for name, column in self.columns.items()}
+
+    @property
+    def nbytes(self) -> int:
+        return sum(column.nbytes for column in self.columns.values())
+
+
+class FeatureStore:
+    """
+    A dataset's features in columnar form.
+
+    Geometries are one contiguous coordinate array with ring/part/geometry
+    offsets (shapely's ragged layout); properties are a PropertyTable.
+    GeoJSON, WKB and shapely geometries are produced on demand.
+    """
+
+    def __init__(self, features: Iterable[bytes]):
+        records, geometries, keys, ids = [], [], {}, []
+        for feature in features:
+            data = orjson.loads(feature)
+            properties = data.get("properties") or {}
+            records.append(properties)
+            keys.update(dict.fromkeys(properties))
+            geometry = data.get("geometry")
+            geometries.append(orjson.dumps(geometry) if geometry else None)
+            ids.append(data.get("id"))
+
+        shapes = shapely.from_geojson(geometries, on_invalid="ignore")
+        self._length = len(records)
+        self._type_ids = shapely.get_type_id(shapes).astype(np.int8)  # -1: no geometry
+        self.properties = PropertyTable(records, list(keys))
+        self.ids = ids if any(i is not None for i in ids) else None
+
+        self._wkb = None
+        try:
+            self.geometry_type, self.coords, self.offsets = shapely.to_ragged_array(
+                shapes if not shapely.is_missing(shapes).any() else _fill_missing(shapes)
+            )
+        except ValueError:
+            # Mixed geometry families have no single ragged layout; keep WKB
+            self.geometry_type, self.coords, self.offsets = None, None, ()
+            self._wkb = shapely.to_wkb(shapes)
+
+        self.features = LazySequence(self._length, self.feature_bytes)
+
+    def __len__(self) -> int:
+        return self._length
+
+    def geometries(self) -> np.ndarray:
+        """Shapely geometries (None where a feature has no geometry)."""
+        if self._wkb is not None:
+            shapes = shapely.from_wkb(self._wkb)
+        else:
+            shapes = shapely.from_ragged_array(self.geometry_type, self.coords, self.offsets)
+            single = (self._type_ids >= 0) & (self._type_ids != int(self.geometry_type))
+            if single.any():
+                # Features that were single-part before the ragged layout promoted them
+                shapes[single] = shapely.get_geometry(shapes[single], 0)
+        shapes[self._type_ids < 0] = None
+        return shapes
+
+    def wkb(self, indices: Optional[np.ndarray] = None) -> np.ndarray:
+        """WKB of all (or the given) features' geometries."""
+        shapes = self.geometries()
+        return shapely.to_wkb(shapes if indices is None else shapes[indices])
+
+    def geometry(self, i: int, precision: Optional[int] = None) -> Optional[Dict]:
+        """GeoJSON geometry dict of feature i, built from the coordinate arrays."""
+        type_id = int(self._type_ids[i])
+        if type_id < 0:
+            return None
+        if self._wkb is not None:
+            shape = shapely.from_wkb(self._wkb[i])
+            if precision is not None:
+                shape = shapely.transform(shape, lambda c: round_coordinates(c, precision))
+            return orjson.loads(shapely.to_geojson(shape))
+
+        family = int(self.geometry_type)
+        offsets = self.offsets
+        start, end = self._coordinate_range(i)
+        coords = self.coords[start:end]
+        if precision is not None:
+            coords = round_coordinates(coords, precision)
+
+        def span(level: int, first: int, last: int) -> range:
+            return range(offsets[level][first], offsets[level][last])
+
+        def points(first: int, last: int) -> List:
+            return coords[first - start:last - start].tolist()
+
+        if family == 0:
+            coordinates = coords[0].tolist()
+        elif family in (1, 4):
+            coordinates = points(offsets[0][i], offsets[0][i + 1])
+        elif family in (3, 5):
+            coordinates = [points(offsets[0][r], offsets[0][r + 1]) for r in span(1, i, i + 1)]
+        else:
+            coordinates = [
+                [points(offsets[0][r], offsets[0][r + 1]) for r in span(1, p, p + 1)]
+                for p in span(2, i, i + 1)
+            ]
+
+        if type_id != family:
+            coordinates = coordinates[0]  # promoted single-part geometry
+        return {"type": GEOMETRY_TYPE_NAMES[type_id], "coordinates": coordinates}
+
+    def _coordinate_range(self, i: int) -> Tuple[int, int]:
+        """Rows of the coordinate array that belong to feature i."""
+        if not self.offsets:
+            return i, i + 1
+        start, end = i, i + 1
+        for level in reversed(self.offsets):
+            start, end = level[start], level[end]
+        return int(start), int(end)
+
+    def feature(self, i: int, precision: Optional[int] = None,
+                fields: Optional[Tuple[str, ...]] = None) -> Dict:
+        """
+        GeoJSON Feature dict of feature i.
+
+        Args:
+            precision: Round coordinates to this many decimal places
+            fields: Only include these properties, in this order
+        """
+        feature = {"type": "Feature"}
+        if self.ids is not None and self.ids[i] is not None:
+            feature["id"] = self.ids[i]
+        if fields is None:
+            feature["properties"] = self.properties[i]
+        else:
+            columns = self.properties.columns
+            feature["properties"] = {
+                name: columns[name].get(i)
+                for name in fields
+                if name in columns and columns[name].is_present(i)
+            }
+        feature["geometry"] = self.geometry(i, precision)
+        return feature
+
+    def feature_bytes(self, i: int, precision: Optional[int] = None,
+                      fields: Optional[Tuple[str, ...]] = None) -> bytes:
+        """Serialized GeoJSON Feature i (see feature())."""
+        return orjson.dumps(self.feature(i, precision, fields))
+
+    @property
+    def nbytes(self) -> int:
+        """Approximate memory held by the store."""
+        geometry = self.coords.nbytes + sum(o.nbytes for o in self.offsets) if self._wkb is None \
+            else sum(len(w) for w in self._wkb)
+        return geometry + self._type_ids.nbytes + self.properties.nbytes
+
+
+def _fill_missing(shapes: np.ndarray) -> np.ndarray:
+    """Replace missing geometries with empties of the collection's family for to_ragged_array."""
+    present = shapes[~shapely.is_missing(shapes)]
+    family = max(shapely.get_type_id(present), default=3)
+    empty = {0: "POINT EMPTY", 1: "LINESTRING EMPTY", 3: "POLYGON EMPTY",
+             4: "MULTIPOINT EMPTY", 5: "MULTILINESTRING EMPTY", 6: "MULTIPOLYGON EMPTY"}.get(int(family))
+    if empty is None:
+        raise ValueError("unsupported geometry type")
+    filled = shapes.copy()
+    filled[shapely.is_missing(shapes)] = shapely.from_wkt(empty)
+    return filled
@@ -0,0 +1,105 @@
+"""
+Binary Geometry Formats
+FlatGeobuf and GeoArrow IPC encodings of cached datasets
+"""
+
+import re
+import tempfile
+from pathlib import Path
+from typing import Optional, Tuple
+import shapely
+from fastapi import HTTPException, Request
+from fastapi.responses import Response
+
+try:
+    import geopandas
+    import pyarrow as pa
+    import pyogrio
+except ImportError:  # binary formats are unavailable without the geo stack
+    geopandas = None
+
+MEDIA_TYPES = {
+    "fgb": "application/flatgeobuf",
+    "arrow": "application/vnd.apache.arrow.stream",
+}
+BYTE_RANGE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+def _dataframe(dataset) -> "geopandas.GeoDataFrame":
+    """GeoDataFrame of a dataset's features that have a geometry."""
+    geometries = dataset.spatial_index().geometries
+    keep = ~shapely.is_missing(geometries)
+    columns = dataset.properties().to_columns(keep)
+    return geopandas.GeoDataFrame(columns, geometry=geometries[keep], crs="EPSG:4326")
+
+
+def to_flatgeobuf(dataset) -> bytes:
+    """
+    Encode a dataset as FlatGeobuf with its packed Hilbert R-tree,
+    so clients can fetch bbox subsets with HTTP range requests.
+    """
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "dataset.fgb"
+        pyogrio.write_dataframe(_dataframe(dataset), path, driver="FlatGeobuf", SPATIAL_INDEX="YES")
+        return path.read_bytes()
+
+
+def to_geoarrow(dataset) -> bytes:
+    """Encode a dataset as an Arrow IPC stream with native GeoArrow geometry."""
+    table = pa.table(_dataframe(dataset).to_arrow(geometry_encoding="geoarrow"))
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+def parse_range(header: Optional[str], size: int) -> Optional[Tuple[int, int]]:
+    """
+    (start, end exclusive) of a single-range Range header, or None to send
+    the whole body (no header, or several ranges).
+
+    Raises:
+        HTTPException 416 when the range lies outside the body
+    """
+    match = BYTE_RANGE.match(header.replace(" ", "")) if header else None
+    if match is None:
+        return None
+    first, last = match.groups()
+    if not first and not last:
+        return None
+    if not first:  # suffix range: the last N bytes
+        start, end = max(size - int(last), 0), size
+    else:
+        start = int(first)
+        end = min(int(last) + 1, size) if last else size
+    if start >= end:
+        raise HTTPException(status_code=416, detail="Range not satisfiable",
+                            headers={"Content-Range": f"bytes */{size}"})
+    return start, end
+
+
+def binary_response(dataset, fmt: str, request: Request) -> Response:
+    """
+    Serve a dataset as FlatGeobuf ("fgb") or GeoArrow IPC ("arrow"), converted once per file version.
+
+    Single byte ranges are answered with 206, so FlatGeobuf clients can read
+    the header and index first and then fetch only the features in a bbox.
+    An If-Range that does not match the current Last-Modified gets the whole body.
+    """
+    if geopandas is None:
+        raise HTTPException(status_code=501, detail=f"format={fmt} requires geopandas, pyogrio and pyarrow")
+
+    encode = to_flatgeobuf if fmt == "fgb" else to_geoarrow
+    content = dataset.cached(("format", fmt), lambda: encode(dataset))
+    headers = {"Accept-Ranges": "bytes"}
+
+    if_range = request.headers.get("if-range")
+    byte_range = None
+    if if_range is None or if_range == dataset.validators()[1]:
+        byte_range = parse_range(request.headers.get("range"), len(content))
+    if byte_range is None:
+        return Response(content=content, media_type=MEDIA_TYPES[fmt], headers=headers)
+
+    start, end = byte_range
+    headers["Content-Range"] = f"bytes {start}-{end - 1}/{len(content)}"
+    return Response(content=content[start:end], status_code=206, media_type=MEDIA_TYPES[fmt], headers=headers)
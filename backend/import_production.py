@@ -0,0 +1,355 @@
+#!/usr/bin/env python3
+"""
+Production Data Importer
+Streams a DNRC ProductionByWell text export into production.db
+
+    python import_production.py ../data/production/production_data.txt [--workers N]
+
+Lines are parsed in chunks by a pool of worker processes and bulk-loaded into
+a staging table inside one transaction; monthly records and per-well totals
+are then merged into the production tables with set-based SQL. The server can
+keep answering well lookups during an import (WAL mode) and sees the new data
+when the import commits.
+"""
+
+import argparse
+import csv
+import io
+import multiprocessing
+import os
+import re
+import sys
+import time
+from collections import deque
+from itertools import islice
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, TextIO, Tuple
+
+import settings
+import production_db
+
+STAGING_COLUMNS = (
+    "api_number", "well_name", "operator", "status", "field", "county",
+    "production_month", "oil_bbls", "gas_mcf", "water_bbls", "days_produced",
+)
+TEXT_FIELDS = ("well_name", "operator", "status", "field", "county")
+NUMBER_FIELDS = ("oil_bbls", "gas_mcf", "water_bbls", "days_produced")
+
+MONTH_NAMES = {name: i + 1 for i, name in enumerate(
+    ["jan", "feb", "mar", "apr", "may", "jun", "jul", "aug", "sep", "oct", "nov", "dec"]
+)}
+ISO_MONTH = re.compile(r"^(\d{4})-(\d{1,2})")
+US_DATE = re.compile(r"^(\d{1,2})/(?:\d{1,2}/)?(\d{4})")
+COMPACT_MONTH = re.compile(r"^(\d{4})(\d{2})$")
+NAMED_MONTH = re.compile(r"^([A-Za-z]{3})[A-Za-z]*[-/ ](\d{4})$")
+
+CREATE_STAGING_SQL = f"""
+    CREATE TEMP TABLE production_staging (
+        api_number TEXT NOT NULL,
+        well_name TEXT,
+        operator TEXT,
+        status TEXT,
+        field TEXT,
+        county TEXT,
+        production_month TEXT NOT NULL,
+        oil_bbls REAL,
+        gas_mcf REAL,
+        water_bbls REAL,
+        days_produced INTEGER
+    )
+"""
+INSERT_STAGING_SQL = (
+    f"INSERT INTO production_staging ({', '.join(STAGING_COLUMNS)}) "
+    f"VALUES ({', '.join('?' for _ in STAGING_COLUMNS)})"
+)
+
+# A well can report several lines for one month (e.g. one per formation)
+MERGE_MONTHS_SQL = """
+    INSERT INTO monthly_production
+        (api_number, production_month, oil_bbls, gas_mcf, water_bbls, days_produced)
+    SELECT api_number, production_month, SUM(oil_bbls), SUM(gas_mcf), SUM(water_bbls), MAX(days_produced)
+    FROM production_staging
+    GROUP BY api_number, production_month
+    ORDER BY api_number, production_month
+    ON CONFLICT (api_number, production_month) DO UPDATE SET
+        oil_bbls = excluded.oil_bbls,
+        gas_mcf = excluded.gas_mcf,
+        water_bbls = excluded.water_bbls,
+        days_produced = excluded.days_produced
+"""
+
+# Totals cover the well's whole history in monthly_production, not just this
+# file, so importing only recent months keeps them right. Daily rates divide by
+# producing days, counting a month without a days figure as an average month.
+# Descriptive fields come from the well's latest month in this file (SQLite
+# takes bare columns from the row that holds MAX()).
+MERGE_WELLS_SQL = f"""
+    INSERT INTO wells
+        (api_number, well_name, operator, status, field, county,
+         first_production_date, last_production_date,
+         total_oil_bbls, total_gas_mcf, total_water_bbls,
+         avg_daily_oil, avg_daily_gas, last_updated)
+    SELECT latest.api_number, latest.well_name, latest.operator, latest.status, latest.field, latest.county,
+           totals.first_month, totals.last_month,
+           totals.oil, totals.gas, totals.water,
+           totals.oil / totals.days, totals.gas / totals.days,
+           datetime('now')
+    FROM (
+        SELECT api_number, well_name, operator, status, field, county, MAX(production_month)
+        FROM production_staging
+        GROUP BY api_number
+    ) AS latest
+    JOIN (
+        SELECT m.api_number,
+               MIN(m.production_month) AS first_month,
+               MAX(m.production_month) AS last_month,
+               SUM(m.oil_bbls) AS oil,
+               SUM(m.gas_mcf) AS gas,
+               SUM(m.water_bbls) AS water,
+               SUM(CASE WHEN m.days_produced > 0 THEN m.days_produced
+                        ELSE {settings.PRODUCTION_IMPORT_DAYS_PER_MONTH} END) AS days
+        FROM monthly_production m
+        WHERE m.api_number IN (SELECT DISTINCT api_number FROM production_staging)
+        GROUP BY m.api_number
+    ) AS totals ON totals.api_number = latest.api_number
+    WHERE true
+    ON CONFLICT (api_number) DO UPDATE SET
+        well_name = COALESCE(excluded.well_name, wells.well_name),
+        operator = COALESCE(excluded.operator, wells.operator),
+        status = COALESCE(excluded.status, wells.status),
+        field = COALESCE(excluded.field, wells.field),
+        county = COALESCE(excluded.county, wells.county),
+        first_production_date = excluded.first_production_date,
+        last_production_date = excluded.last_production_date,
+        total_oil_bbls = excluded.total_oil_bbls,
+        total_gas_mcf = excluded.total_gas_mcf,
+        total_water_bbls = excluded.total_water_bbls,
+        avg_daily_oil = excluded.avg_daily_oil,
+        avg_daily_gas = excluded.avg_daily_gas,
+        last_updated = excluded.last_updated
+"""
+
+
+def _normalize_header(name: str) -> str:
+    return re.sub(r"[^a-z0-9]", "", name.lower())
+
+
+def detect_columns(header: List[str]) -> Dict[str, int]:
+    """
+    Map staging fields to column positions using settings.PRODUCTION_IMPORT_COLUMNS.
+
+    Raises:
+        ValueError if the API number, a date and oil volume columns are not all present
+    """
+    positions = {_normalize_header(name): i for i, name in enumerate(header)}
+    columns = {}
+    for field, aliases in settings.PRODUCTION_IMPORT_COLUMNS.items():
+        for alias in aliases:
+            if _normalize_header(alias) in positions:
+                columns[field] = positions[_normalize_header(alias)]
+                break
+
+    has_date = "production_month" in columns or {"year", "month"} <= columns.keys()
+    missing = [name for name, ok in [("api_number", "api_number" in columns),
+                                     ("production month", has_date),
+                                     ("oil_bbls", "oil_bbls" in columns)] if not ok]
+    if missing:
+        raise ValueError(f"Missing columns for {', '.join(missing)}; header is {header}")
+    return columns
+
+
+def parse_month(text: str) -> Optional[str]:
+    """Normalize a report date (2021-03, 3/2021, 3/1/2021, 202103, Mar-2021) to YYYY-MM."""
+    text = text.strip()
+    match = ISO_MONTH.match(text) or COMPACT_MONTH.match(text)
+    if match:
+        year, month = int(match.group(1)), int(match.group(2))
+    elif (match := US_DATE.match(text)):
+        month, year = int(match.group(1)), int(match.group(2))
+    elif (match := NAMED_MONTH.match(text)) and match.group(1).lower() in MONTH_NAMES:
+        month, year = MONTH_NAMES[match.group(1).lower()], int(match.group(2))
+    else:
+        return None
+    return f"{year:04d}-{month:02d}" if 1 <= month <= 12 else None
+
+
+def _number(text: str) -> float:
+    text = text.strip().replace(",", "")
+    return float(text) if text else 0.0
+
+
+def parse_chunk(args: Tuple[str, str, Dict[str, int]]) -> Tuple[List[tuple], int]:
+    """
+    Parse a block of export lines into staging rows (runs in a worker process).
+
+    Returns:
+        (staging rows, number of lines rejected for a missing API number,
+        unreadable date or non-numeric volume)
+    """
+    text, delimiter, columns = args
+    rows = []
+    rejected = 0
+    # An export repeats each API number and report date many times over
+    api_numbers: Dict[str, str] = {}
+    months: Dict[str, Optional[str]] = {}
+    api_col = columns["api_number"]
+    text_cols = [(field, columns.get(field)) for field in TEXT_FIELDS]
+    number_cols = [columns.get(field) for field in NUMBER_FIELDS]
+
+    for record in csv.reader(io.StringIO(text), delimiter=delimiter):
+        if not record:
+            continue
+        try:
+            raw_api = record[api_col]
+            api_number = api_numbers.get(raw_api)
+            if api_number is None:
+                api_number = api_numbers[raw_api] = production_db.normalize_api_number(raw_api) or ""
+            if "production_month" in columns:
+                date = record[columns["production_month"]]
+            else:
+                date = f"{record[columns['year']].strip()}-{record[columns['month']].strip()}"
+            if date not in months:
+                months[date] = parse_month(date)
+            month = months[date]
+            if not api_number or month is None:
+                rejected += 1
+                continue
+            texts = [record[i].strip() or None if i is not None else None for _, i in text_cols]
+            numbers = [_number(record[i]) if i is not None else 0.0 for i in number_cols]
+        except (IndexError, ValueError):
+            rejected += 1
+            continue
+        numbers[3] = int(numbers[3])
+        rows.append((api_number, *texts, month, *numbers))
+    return rows, rejected
+
+
+def read_header(f: TextIO) -> Tuple[List[str], str]:
+    """Read the header row and guess the delimiter (tab, comma or pipe) from it."""
+    header_line = f.readline()
+    delimiter = max("\t,|", key=header_line.count)
+    return next(csv.reader([header_line], delimiter=delimiter)), delimiter
+
+
+def read_chunks(f: TextIO, chunk_rows: int) -> Iterator[str]:
+    """
+    Yield the rest of the file as blocks of about chunk_rows lines, cut between records.
+
+    A quoted field can contain a newline, so a block that ends with an odd
+    number of double quotes is extended until they balance. The extension
+    stops after another chunk_rows lines: by then the odd quote is a literal
+    one inside an unquoted field, not the start of a multi-line value.
+    """
+    while True:
+        lines = list(islice(f, chunk_rows))
+        if not lines:
+            return
+        quotes = sum(line.count('"') for line in lines)
+        for line in islice(f, chunk_rows) if quotes % 2 else ():
+            lines.append(line)
+            quotes += line.count('"')
+            if not quotes % 2:
+                break
+        yield "".join(lines)
+
+
+def imap_bounded(pool: "multiprocessing.pool.Pool", fn: Callable[[Any], Any], tasks: Iterable[Any],
+                 window: int) -> Iterator[Any]:
+    """
+    pool.imap(fn, tasks) with at most window tasks in flight.
+
+    imap reads ahead and queues results for as long as workers keep up, so
+    with a slower consumer (the single SQLite writer) a whole file's parsed
+    rows would pile up in memory. Here the next task is submitted only once
+    the oldest result has been taken.
+    """
+    pending = deque()
+    for task in tasks:
+        if len(pending) >= window:
+            yield pending.popleft().get()
+        pending.append(pool.apply_async(fn, (task,)))
+    while pending:
+        yield pending.popleft().get()
+
+
+def import_file(path: Path, workers: int, chunk_rows: int) -> Dict[str, float]:
+    """
+    Import one export file.
+
+    Returns:
+        Counts and timings: rows, rejected, wells, months, parse_seconds,
+        merge_seconds, total_seconds
+    """
+    start = time.perf_counter()
+    production_db.init_database()
+    conn = production_db.get_connection()
+    # The staging table can hold a full statewide history; keep it on disk
+    conn.execute("PRAGMA temp_store = FILE")
+    conn.execute("DROP TABLE IF EXISTS temp.production_staging")
+    conn.execute(CREATE_STAGING_SQL)
+
+    rows = rejected = 0
+    with open(path, "r", encoding="utf-8-sig", errors="replace", newline="") as f:
+        header, delimiter = read_header(f)
+        columns = detect_columns(header)
+        print(f"Importing {path} ({os.path.getsize(path) / 1e6:.1f} MB, {workers} workers)")
+        print(f"  Columns: {', '.join(f'{field}={header[i]!r}' for field, i in columns.items())}")
+
+        # One transaction: readers see the previous data until the import commits
+        with conn, multiprocessing.Pool(workers) as pool:
+            tasks = ((text, delimiter, columns) for text in read_chunks(f, chunk_rows))
+            window = workers * settings.PRODUCTION_IMPORT_CHUNKS_PER_WORKER
+            for parsed, chunk_rejected in imap_bounded(pool, parse_chunk, tasks, window):
+                conn.executemany(INSERT_STAGING_SQL, parsed)
+                rows += len(parsed)
+                rejected += chunk_rejected
+                elapsed = time.perf_counter() - start
+                print(f"\r  Loaded {rows:,} rows ({rows / elapsed:,.0f} rows/sec)", end="", flush=True)
+            print()
+            parse_seconds = time.perf_counter() - start
+
+            months = conn.execute(MERGE_MONTHS_SQL).rowcount
+            wells = conn.execute(MERGE_WELLS_SQL).rowcount
+            conn.execute("DROP TABLE temp.production_staging")
+
+    total = time.perf_counter() - start
+    return {
+        "rows": rows,
+        "rejected": rejected,
+        "wells": wells,
+        "months": months,
+        "parse_seconds": parse_seconds,
+        "merge_seconds": total - parse_seconds,
+        "total_seconds": total,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import a DNRC ProductionByWell text export into production.db")
+    parser.add_argument("path", type=Path, help="Tab, comma or pipe delimited export with a header row")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Parser processes")
+    parser.add_argument("--chunk-rows", type=int, default=settings.PRODUCTION_IMPORT_CHUNK_ROWS,
+                        help="Lines per parse task")
+    args = parser.parse_args()
+
+    if not args.path.exists():
+        print(f"ERROR: {args.path} not found")
+        sys.exit(1)
+
+    try:
+        stats = import_file(args.path, max(args.workers, 1), args.chunk_rows)
+    except ValueError as e:
+        print(f"ERROR: {e}")
+        sys.exit(1)
+
+    print(f"✓ Imported {stats['rows']:,} rows into {production_db.DB_PATH}")
+    print(f"  {stats['months']:,} well-months, {stats['wells']:,} wells updated")
+    if stats["rejected"]:
+        print(f"  {stats['rejected']:,} lines skipped (no API number, unreadable date or volume)")
+    print(f"  Load {stats['parse_seconds']:.1f} s ({stats['rows'] / max(stats['parse_seconds'], 1e-9):,.0f} rows/sec), "
+          f"merge {stats['merge_seconds']:.1f} s, total {stats['total_seconds']:.1f} s "
+          f"({stats['rows'] / max(stats['total_seconds'], 1e-9):,.0f} rows/sec)")
+
+
+if __name__ == "__main__":
+    main()
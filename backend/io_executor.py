@@ -0,0 +1,84 @@
+"""
+Blocking I/O Executor
+Runs file, database and CPU-heavy work on a bounded thread pool so the event loop stays responsive
+"""
+
+import asyncio
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, AsyncIterator, Callable, Dict, Iterator
+import settings
+
+
+class IOExecutor:
+    """
+    One bounded thread pool shared by all endpoints, with a concurrency limit
+    per group (settings.IO_CONCURRENCY_LIMITS).
+
+    A group that is saturated (e.g. a burst of cold dataset loads) queues on
+    its own semaphore instead of occupying every worker, so tiles and
+    lookups keep getting threads.
+    """
+
+    def __init__(self, max_workers: int, limits: Dict[str, int]):
+        self.max_workers = max_workers
+        self.limits = limits
+        self._executor = None
+        self._semaphores: Dict[str, asyncio.Semaphore] = {}
+
+    def _pool(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="io")
+        return self._executor
+
+    def start(self):
+        """
+        Start every worker now. Threads spawned on demand during a burst have
+        to win the GIL from busy workers before the event loop can go on.
+        """
+        barrier = threading.Barrier(self.max_workers + 1)
+        for _ in range(self.max_workers):
+            self._pool().submit(barrier.wait)
+        barrier.wait()
+
+    def _semaphore(self, group: str) -> asyncio.Semaphore:
+        semaphore = self._semaphores.get(group)
+        if semaphore is None:
+            semaphore = self._semaphores[group] = asyncio.Semaphore(self.limits[group])
+        return semaphore
+
+    async def run(self, group: str, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        """
+        Call fn(*args, **kwargs) on the pool once the group has a free slot.
+
+        Exceptions (including HTTPException) propagate to the caller unchanged.
+        """
+        async with self._semaphore(group):
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._pool(), functools.partial(fn, *args, **kwargs))
+
+    def shutdown(self):
+        """Wait for running calls and stop the workers."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+        self._semaphores = {}
+
+
+io_executor = IOExecutor(settings.IO_THREAD_POOL_SIZE, settings.IO_CONCURRENCY_LIMITS)
+
+
+async def run_io(group: str, fn: Callable[..., Any], *args, **kwargs) -> Any:
+    """Run blocking work for an endpoint group on the shared I/O executor."""
+    return await io_executor.run(group, fn, *args, **kwargs)
+
+
+async def iterate_io(group: str, iterator: Iterator[Any]) -> AsyncIterator[Any]:
+    """Drive a blocking iterator on the executor, e.g. as a StreamingResponse body."""
+    done = object()
+    while True:
+        item = await run_io(group, next, iterator, done)
+        if item is done:
+            return
+        yield item
@@ -0,0 +1,277 @@
+"""
+Point Lookup
+Answers "what is under this point" from the in-memory TIGER and PAD-US indexes
+
+Also usable offline to tag NDJSON records (objects with lon/lat, or GeoJSON
+Point features) with county, tract, block group, place and ownership:
+
+    python backend/lookup.py wells.ndjson > wells_tagged.ndjson
+"""
+
+import csv
+import io
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+import orjson
+import shapely
+from fastapi import HTTPException
+import settings
+from datasets import Dataset, DatasetRegistry
+
+Points = Tuple[List, np.ndarray, np.ndarray]  # (ids, lons, lats)
+
+
+class PointLookup:
+    """Point-in-polygon queries over the TIGER layers and PAD-US ownership."""
+
+    def __init__(self, tiger_layers: DatasetRegistry, ownership: Dataset):
+        self.tiger_layers = tiger_layers
+        self.ownership = ownership
+
+    def _layer(self, key: str) -> Optional[Dataset]:
+        """First configured layer for a lookup key whose file exists."""
+        if key == "ownership":
+            return self.ownership if self.ownership.path.exists() else None
+        for name in settings.LOOKUP_LAYERS[key]:
+            dataset = self.tiger_layers.datasets.get(name)
+            if dataset is not None and dataset.path.exists():
+                return dataset
+        return None
+
+    def warm(self):
+        """Build the spatial indexes up front so the first click is fast."""
+        for key in [*settings.LOOKUP_LAYERS, "ownership"]:
+            dataset = self._layer(key)
+            if dataset is not None:
+                dataset.spatial_index()
+                dataset.properties()
+
+    def point(self, lon: float, lat: float) -> Dict:
+        """
+        Look up the census units, place and ownership at a point.
+
+        Returns:
+            Dictionary with county, tract, blockgroup and place properties
+            (None where nothing contains the point) and a list of PAD-US units
+        """
+        point = shapely.Point(lon, lat)
+        result = {"lon": lon, "lat": lat}
+
+        for key in settings.LOOKUP_LAYERS:
+            dataset = self._layer(key)
+            result[key] = None
+            if dataset is None:
+                continue
+            matches = dataset.spatial_index().containing(point)
+            if len(matches):
+                result[key] = dataset.properties()[matches[0]]
+
+        result["ownership"] = []
+        ownership = self._layer("ownership")
+        if ownership is not None:
+            properties = ownership.properties()
+            result["ownership"] = [
+                _ownership_fields(properties[i])
+                for i in ownership.spatial_index().containing(point)
+            ]
+
+        return result
+
+    def nearest(self, lon: float, lat: float, k: int = 1,
+                owner_classes: Optional[List[str]] = None) -> List[Dict]:
+        """
+        The k PAD-US units nearest to a point (distance 0 for units containing it).
+
+        Args:
+            owner_classes: Only consider units of these owner_class values
+
+        Returns:
+            One dictionary per unit, nearest first: distance_m, the closest
+            point on the unit and its LOOKUP_OWNERSHIP_FIELDS
+
+        Raises:
+            HTTPException 404 if the ownership data has not been prepared
+        """
+        ownership = self._layer("ownership")
+        if ownership is None:
+            raise HTTPException(status_code=404, detail=f"GeoJSON not found at {self.ownership.path}")
+
+        table = ownership.properties()
+        mask = None
+        if owner_classes:
+            column = table.column("owner_class")
+            mask = column.isin(owner_classes) if column is not None else np.zeros(len(table), dtype=bool)
+
+        indices, distances, closest = ownership.spatial_index().nearest(
+            lon, lat, k, mask,
+            start_radius_m=settings.NEAREST_START_RADIUS_M,
+            max_radius_m=settings.NEAREST_MAX_RADIUS_M,
+        )
+        return [
+            {
+                "distance_m": round(float(distance), 1),
+                "closest_point": [round(float(x), 6), round(float(y), 6)],
+                **_ownership_fields(table[i]),
+            }
+            for i, distance, (x, y) in zip(indices.tolist(), distances, closest)
+        ]
+
+    def points(self, lons: np.ndarray, lats: np.ndarray) -> Dict[str, List]:
+        """
+        Tag many points at once with the settings.LOOKUP_BATCH_COLUMNS values.
+
+        Each layer is resolved with one bulk STRtree query over all points.
+        Where several PAD-US units overlap, the first in file order is used.
+
+        Returns:
+            Dictionary of column name -> values in input order (None where unmatched)
+        """
+        geometries = shapely.points(lons, lats)
+        matches = {}
+        for _, key, _ in settings.LOOKUP_BATCH_COLUMNS:
+            if key in matches:
+                continue
+            dataset = self._layer(key)
+            matches[key] = (
+                dataset.spatial_index().first_containing(geometries) if dataset is not None
+                else np.full(len(geometries), -1, dtype=np.int64)
+            )
+
+        columns = {}
+        for column, key, field in settings.LOOKUP_BATCH_COLUMNS:
+            dataset = self._layer(key)
+            source = dataset.properties().column(field) if dataset is not None else None
+            columns[column] = source.take(matches[key]) if source is not None else [None] * len(geometries)
+        return columns
+
+
+def _ownership_fields(props: Dict) -> Dict:
+    """The PAD-US attributes returned by lookups."""
+    return {field: props.get(field) for field in settings.LOOKUP_OWNERSHIP_FIELDS}
+
+
+def _coordinates(lons: List, lats: List) -> Tuple[np.ndarray, np.ndarray]:
+    """Validate and convert coordinate lists (400 on bad input)."""
+    if len(lons) > settings.LOOKUP_BATCH_MAX_POINTS:
+        raise HTTPException(
+            status_code=413,
+            detail=f"At most {settings.LOOKUP_BATCH_MAX_POINTS} points per request"
+        )
+    try:
+        lons = np.asarray(lons, dtype=np.float64)
+        lats = np.asarray(lats, dtype=np.float64)
+    except (TypeError, ValueError):
+        raise HTTPException(status_code=400, detail="lon/lat values must be numbers")
+    if not (np.all(np.isfinite(lons)) and np.all(np.isfinite(lats))):
+        raise HTTPException(status_code=400, detail="lon/lat values must be finite numbers")
+    return lons, lats
+
+
+def parse_points_json(body: bytes) -> Points:
+    """
+    Parse a JSON batch: {"points": [...]} or a bare list, where each point is
+    [lon, lat] or {"id": ..., "lon": ..., "lat": ...}.
+    """
+    try:
+        data = orjson.loads(body)
+    except orjson.JSONDecodeError:
+        raise HTTPException(status_code=400, detail="Request body is not valid JSON")
+    points = data.get("points") if isinstance(data, dict) else data
+    if not isinstance(points, list):
+        raise HTTPException(status_code=400, detail='Expected a list of points or {"points": [...]}')
+
+    ids, lons, lats = [], [], []
+    try:
+        for point in points:
+            if isinstance(point, dict):
+                ids.append(point.get("id"))
+                lons.append(point["lon"])
+                lats.append(point["lat"])
+            else:
+                ids.append(None)
+                lons.append(point[0])
+                lats.append(point[1])
+    except (KeyError, IndexError, TypeError):
+        raise HTTPException(status_code=400, detail="Each point needs lon and lat")
+
+    return (ids, *_coordinates(lons, lats))
+
+
+def parse_points_csv(text: str) -> Points:
+    """Parse a CSV batch with lon and lat columns and an optional id column."""
+    reader = csv.DictReader(io.StringIO(text))
+    if not reader.fieldnames or "lon" not in reader.fieldnames or "lat" not in reader.fieldnames:
+        raise HTTPException(status_code=400, detail="CSV needs a header with lon and lat columns")
+
+    ids, lons, lats = [], [], []
+    for row in reader:
+        ids.append(row.get("id"))
+        lons.append(row["lon"])
+        lats.append(row["lat"])
+    return (ids, *_coordinates(lons, lats))
+
+
+def batch_results(ids: List, lons: np.ndarray, lats: np.ndarray, columns: Dict[str, List]) -> List[Dict]:
+    """Row records (id, lon, lat and lookup columns) in input order."""
+    names = ["id", "lon", "lat", *columns]
+    rows = zip(ids, lons.tolist(), lats.tolist(), *columns.values())
+    return [dict(zip(names, row)) for row in rows]
+
+
+def batch_csv(ids: List, lons: np.ndarray, lats: np.ndarray, columns: Dict[str, List]) -> str:
+    """CSV text (id, lon, lat and lookup columns) in input order."""
+    out = io.StringIO()
+    writer = csv.writer(out)
+    writer.writerow(["id", "lon", "lat", *columns])
+    writer.writerows(zip(ids, lons.tolist(), lats.tolist(), *columns.values()))
+    return out.getvalue()
+
+
+def _record_coordinates(record: Dict) -> Tuple[float, float]:
+    """lon/lat of an NDJSON record: a GeoJSON Point feature or an object with lon/lat."""
+    geometry = record.get("geometry")
+    if isinstance(geometry, dict) and geometry.get("type") == "Point":
+        return geometry["coordinates"][0], geometry["coordinates"][1]
+    return record["lon"], record["lat"]
+
+
+def main(argv: List[str]) -> int:
+    """Tag NDJSON records from a file (or stdin) and write NDJSON to stdout."""
+    source = open(argv[1], "rb") if len(argv) > 1 else sys.stdin.buffer
+    records = [orjson.loads(line) for line in source if line.strip()]
+    if source is not sys.stdin.buffer:
+        source.close()
+
+    start = time.perf_counter()
+    coordinates = [_record_coordinates(record) for record in records]
+    lons = np.array([c[0] for c in coordinates], dtype=np.float64)
+    lats = np.array([c[1] for c in coordinates], dtype=np.float64)
+
+    lookup = PointLookup(
+        DatasetRegistry(settings.TIGER_DIR, settings.TIGER_LAYERS, "TIGER"),
+        Dataset(settings.OWNERSHIP_NDJSON_PATH, "GeoJSON", "ownership"),
+    )
+    lookup.warm()
+    indexed = time.perf_counter()
+    columns = lookup.points(lons, lats)
+    done = time.perf_counter()
+
+    out = sys.stdout.buffer
+    for i, record in enumerate(records):
+        target = record.setdefault("properties", {}) if "geometry" in record else record
+        for column, values in columns.items():
+            target[column] = values[i]
+        out.write(orjson.dumps(record) + b"\n")
+
+    rate = len(records) / (done - indexed) if done > indexed else float("inf")
+    print(f"Tagged {len(records)} points from {Path(argv[1]).name if len(argv) > 1 else 'stdin'} "
+          f"(index {indexed - start:.2f}s, lookup {done - indexed:.2f}s, {rate:,.0f} points/sec)",
+          file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv))
@@ -3,21 +3,34 @@ FastAPI Tile Server
 Main application entry point
 """
 
-from fastapi import FastAPI, HTTPException, WebSocket, WebSocketDisconnect
+from fastapi import FastAPI, HTTPException, Path, Query, Request, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse, Response, StreamingResponse
 import settings
-from tiles import get_ownership_tile
-import json
-from pathlib import Path
-from production_db import get_well_production
+from tiles import get_ownership_tile, get_wells_tile
+from datasets import FULL_VIEW, Dataset, DatasetRegistry, parse_fields
+from spatial import parse_bbox
+from formats import binary_response
+from vector_tiles import tile_response
+from topology import TopologyCache
+from acs import CLASS_METHODS, classify, columns_response, geometry_response
+from area_query import AreaQuery, parse_area
+from lookup import PointLookup, parse_points_json, parse_points_csv, batch_results, batch_csv
+from typing import List, Optional
+from production_db import get_well_production, get_wells_production
 from eia_api import get_all_montana_data, format_eia_data_for_display
 from ais_stream import ais_manager
+from io_executor import io_executor, iterate_io, run_io
 import asyncio
+import orjson
 
 app = FastAPI(
     title="US Ownership Tile Server",
     description="Serves PAD-US vector tiles and GeoJSON data",
-    version="1.0.1"
+    version="1.0.1",
+    # orjson for every JSON route; handlers return ORJSONResponse directly
+    # so their dicts skip jsonable_encoder
+    default_response_class=ORJSONResponse
 )
 
 # CORS middleware
@@ -25,44 +38,106 @@ app.add_middleware(
     CORSMiddleware,
     allow_origins=settings.ALLOWED_ORIGINS,
     allow_credentials=True,
-    allow_methods=["GET"],
+    allow_methods=["GET", "POST"],
     allow_headers=["*"],
 )
 
+ownership_dataset = Dataset(settings.OWNERSHIP_NDJSON_PATH, "GeoJSON", "ownership")
+parcels_dataset = Dataset(settings.PARCELS_GEOJSON_PATH, "Parcel data", "parcels")
+tiger_layers = DatasetRegistry(settings.TIGER_DIR, settings.TIGER_LAYERS, "TIGER")
+tiger_topology = TopologyCache(tiger_layers)
+point_lookup = PointLookup(tiger_layers, ownership_dataset)
+area_query = AreaQuery(tiger_layers, ownership_dataset, parcels_dataset)
+
+
+def _dataset_response(dataset: Dataset, request: Request, fmt: str, bbox: Optional[str],
+                      limit: Optional[int], cursor: Optional[int], zoom: Optional[int] = None,
+                      precision: Optional[int] = None, fields: Optional[str] = None):
+    """
+    Serve a whole dataset, or only the features inside bbox, for the requested view.
+
+    Responses carry ETag/Last-Modified of the file version and view;
+    conditional requests for an unchanged view get a 304 without building a body.
+    """
+    if fmt in ("fgb", "arrow") and any(p is not None for p in (bbox, zoom, precision, fields)):
+        raise HTTPException(
+            status_code=400,
+            detail=f"bbox, zoom, precision and fields are not supported with format={fmt}"
+        )
+
+    view = FULL_VIEW if fmt in ("fgb", "arrow") else dataset.make_view(zoom, precision, fields)
+    not_modified = dataset.not_modified(request, view)
+    if not_modified is not None:
+        return not_modified
+
+    if fmt in ("fgb", "arrow"):
+        response = binary_response(dataset, fmt, request)
+    else:
+        if bbox is not None:
+            response = dataset.bbox_response(request, parse_bbox(bbox), limit, cursor, fmt, view)
+        else:
+            response = dataset.response(request, fmt, view)
+
+    response.headers.update(dataset.cache_headers(view))
+    return response
+
 
 @app.on_event("startup")
 async def startup_event():
-    """Start AIS stream manager on application startup"""
+    """Preload TIGER layers and topology, build lookup indexes and start AIS stream manager on application startup"""
+    io_executor.start()
+    await run_io("startup", tiger_layers.preload)
+    await run_io("startup", tiger_topology.preload, settings.TOPOJSON_DEFAULT_LAYERS, settings.TOPOJSON_QUANTIZATION)
+    await run_io("startup", point_lookup.warm)
     asyncio.create_task(ais_manager.start())
 
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Let in-flight I/O finish and stop the executor threads."""
+    io_executor.shutdown()
+
+
 @app.get("/")
 async def root():
     """Root endpoint."""
-    return {
+    return ORJSONResponse({
         "name": "Montana Property & Energy Map API",
         "version": "1.1.0",
         "endpoints": {
             "health": "/health",
             "tiles": "/tiles/ownership/{z}/{x}/{y}.pbf",
+            "wells_tiles": "/tiles/wells/{z}/{x}/{y}.pbf",
+            "tiger_tiles": "/tiles/tiger/{layer}/{z}/{x}/{y}.pbf",
             "ownership_data": "/data/ownership.geojson",
             "parcels_data": "/data/parcels.geojson",
             "well_production": "/api/well-production/{api_number}",
+            "well_production_batch": "/api/well-production/batch?months=12",
             "eia_montana": "/api/eia/montana-data",
+            "lookup": "/api/lookup?lon={lon}&lat={lat}",
+            "lookup_batch": "/api/lookup/batch",
+            "query_intersects": "/api/query/intersects?clip=false&acreage=true",
+            "ownership_nearest": "/api/ownership/nearest?lon={lon}&lat={lat}&owner_class=federal,state&k=3",
+            "ownership_nearest_batch": "/api/ownership/nearest/batch",
+            "acs_geometry": "/api/acs/{level}/geometry?zoom={zoom}&v={version}",
+            "acs_columns": "/api/acs/{level}/columns?vars=total_population,median_household_income",
+            "acs_classes": "/api/acs/{level}/{variable}/classes?method=quantile&classes=5",
             "ais_websocket": "/ws/ais",
+            "tiger_layer": "/data/tiger/{layer}.geojson",
+            "tiger_topology": "/data/tiger/topology.json?layers=counties_acs,tracts_acs",
             "tiger_counties": "/data/tiger/counties.geojson",
             "tiger_tracts": "/data/tiger/tracts.geojson",
             "tiger_blockgroups": "/data/tiger/blockgroups.geojson",
             "tiger_places": "/data/tiger/places.geojson",
             "tiger_zipcodes": "/data/tiger/zipcodes.geojson"
         }
-    }
+    })
 
 
 @app.get("/health")
 async def health():
     """Health check endpoint."""
-    return {"status": "ok"}
+    return ORJSONResponse({"status": "ok"})
 
 
 @app.get("/tiles/ownership/{z}/{x}/{y}.pbf")
@@ -81,50 +156,148 @@ async def tiles_endpoint(z: int, x: int, y: int):
     return await get_ownership_tile(z, x, y)
 
 
-@app.get("/data/ownership.geojson")
-async def get_ownership_geojson():
+@app.get("/tiles/wells/{z}/{x}/{y}.pbf")
+async def wells_tiles_endpoint(z: int, x: int, y: int):
     """
-    Serve complete ownership data as GeoJSON.
-    For simple rendering without vector tiles.
+    Serve wells vector tiles.
+
+    Below z12 each tile holds grid clusters with point_count and summed
+    production; individual wells are served from z12 up.
+
+    Args:
+        z: Zoom level (4-14)
+        x: Tile column
+        y: Tile row
+
+    Returns:
+        Vector tile (gzipped protobuf)
+    """
+    return await get_wells_tile(z, x, y)
+
+
+@app.get("/tiles/tiger/{layer}/{z}/{x}/{y}.pbf")
+async def tiger_tiles_endpoint(
+    layer: str,
+    z: int = Path(..., ge=0, le=settings.VECTOR_TILE_MAX_ZOOM),
+    x: int = Path(..., ge=0),
+    y: int = Path(..., ge=0),
+):
+    """
+    Serve a TIGER layer as vector tiles cut from the in-memory geometries.
+
+    Each tile is clipped and simplified for its zoom and keeps all properties,
+    so the *_acs layers carry their ACS attributes. The MVT layer name is the
+    TIGER layer name.
+
+    Args:
+        layer: TIGER layer name (e.g. counties_acs, tracts_acs, places)
+        z: Zoom level
+        x: Tile column
+        y: Tile row
+
+    Returns:
+        Vector tile (gzipped protobuf), or 204 when no feature reaches the tile
     """
-    # Path is relative to backend/ directory, go up one level to project root
-    geojson_path = Path(__file__).parent.parent / "data" / "padus" / "padus_clean.ndjson"
+    if x >= 1 << z or y >= 1 << z:
+        raise HTTPException(status_code=404, detail="Tile not found")
 
-    # Resolve to absolute path to debug
-    geojson_path = geojson_path.resolve()
+    return await run_io("tiles", tile_response, tiger_layers.get(layer), layer, z, x, y)
 
-    if not geojson_path.exists():
-        raise HTTPException(status_code=404, detail=f"GeoJSON not found at {geojson_path}")
 
-    # Load all features
-    features = []
-    with open(geojson_path, 'r') as f:
-        for line in f:
-            if line.strip():
-                features.append(json.loads(line))
+@app.get("/data/ownership.geojson")
+async def get_ownership_geojson(
+    request: Request,
+    fmt: str = Query("geojson", alias="format", pattern="^(geojson|ndjson|fgb|arrow)$"),
+    bbox: Optional[str] = Query(None, description="minx,miny,maxx,maxy"),
+    limit: Optional[int] = Query(None, ge=1),
+    cursor: Optional[int] = Query(None, ge=0),
+    precision: Optional[int] = Query(None, ge=0, le=15),
+    fields: Optional[str] = Query(None, description="Comma-separated property names, * for all"),
+):
+    """
+    Serve complete ownership data as GeoJSON.
+    For simple rendering without vector tiles.
 
-    return {
-        "type": "FeatureCollection",
-        "features": features
-    }
+    Args:
+        format: "geojson" for a FeatureCollection, "ndjson" for newline-delimited features,
+                "fgb" for FlatGeobuf, "arrow" for GeoArrow IPC
+        bbox: Only return features intersecting minx,miny,maxx,maxy
+        limit: Maximum features per page (with bbox)
+        cursor: next_cursor from the previous page (with bbox)
+        precision: Coordinate decimal places (default per layer in settings)
+        fields: Properties to keep (default per layer in settings)
+
+    The FeatureCollection is served from memory until padus_clean.ndjson
+    changes; files over GEOJSON_CACHE_MAX_BYTES and NDJSON are streamed.
+    """
+    return await run_io("datasets", _dataset_response, ownership_dataset, request, fmt, bbox, limit, cursor,
+                        precision=precision, fields=fields)
 
 
 @app.get("/data/parcels.geojson")
-async def get_parcels_geojson():
+async def get_parcels_geojson(
+    request: Request,
+    fmt: str = Query("geojson", alias="format", pattern="^(geojson|ndjson|fgb|arrow)$"),
+    bbox: Optional[str] = Query(None, description="minx,miny,maxx,maxy"),
+    limit: Optional[int] = Query(None, ge=1),
+    cursor: Optional[int] = Query(None, ge=0),
+    precision: Optional[int] = Query(None, ge=0, le=15),
+    fields: Optional[str] = Query(None, description="Comma-separated property names, * for all"),
+):
     """
     Serve test parcel data as GeoJSON.
+
+    Args:
+        format: "geojson" for a FeatureCollection, "ndjson" for newline-delimited features,
+                "fgb" for FlatGeobuf, "arrow" for GeoArrow IPC
+        bbox: Only return features intersecting minx,miny,maxx,maxy
+        limit: Maximum features per page (with bbox)
+        cursor: next_cursor from the previous page (with bbox)
+        precision: Coordinate decimal places (default per layer in settings)
+        fields: Properties to keep (default per layer in settings)
     """
-    # Path is relative to backend/ directory, go up one level to project root
-    parcels_path = Path(__file__).parent.parent / "data" / "parcels" / "test_parcels.geojson"
+    return await run_io("datasets", _dataset_response, parcels_dataset, request, fmt, bbox, limit, cursor,
+                        precision=precision, fields=fields)
 
-    # Resolve to absolute path to debug
-    parcels_path = parcels_path.resolve()
 
-    if not parcels_path.exists():
-        raise HTTPException(status_code=404, detail=f"Parcel data not found at {parcels_path}")
+@app.post("/api/well-production/batch")
+async def well_production_batch_endpoint(
+    request: Request,
+    months: int = Query(0, ge=0, le=settings.PRODUCTION_BATCH_MAX_MONTHS),
+):
+    """
+    Fetch production data for many wells in one request.
 
-    with open(parcels_path, 'r') as f:
-        return json.load(f)
+    Body: {"api_numbers": ["25001050000000", ...]} or a bare list
+
+    Args:
+        months: Recent months of production to include per well (0: summaries only)
+
+    Returns:
+        {"count", "wells", "missing"}: wells in request order with the same
+        fields as /api/well-production/{api_number}, and the API numbers
+        without production data
+    """
+    try:
+        data = orjson.loads(await request.body())
+    except orjson.JSONDecodeError:
+        raise HTTPException(status_code=400, detail="Body must be JSON")
+    api_numbers = data.get("api_numbers") if isinstance(data, dict) else data
+    if not isinstance(api_numbers, list) or not all(isinstance(a, (str, int)) for a in api_numbers):
+        raise HTTPException(status_code=400, detail='Body must be {"api_numbers": [...]}')
+    if len(api_numbers) > settings.PRODUCTION_BATCH_MAX_WELLS:
+        raise HTTPException(
+            status_code=413,
+            detail=f"At most {settings.PRODUCTION_BATCH_MAX_WELLS} wells per request"
+        )
+
+    api_numbers = list(dict.fromkeys(str(a) for a in api_numbers))
+    found = await run_io("database", get_wells_production, api_numbers, months)
+    return ORJSONResponse({
+        "count": len(found),
+        "wells": [found[a] for a in api_numbers if a in found],
+        "missing": [a for a in api_numbers if a not in found],
+    })
 
 
 @app.get("/api/well-production/{api_number}")
@@ -142,7 +315,7 @@ async def get_well_production_endpoint(api_number: str):
         raise HTTPException(status_code=400, detail="API number is required")
 
     # Fetch production data from local database
-    production_data = get_well_production(api_number)
+    production_data = await run_io("database", get_well_production, api_number)
 
     if production_data is None:
         raise HTTPException(
@@ -151,7 +324,233 @@ async def get_well_production_endpoint(api_number: str):
                    f"Have you imported the production data? See PRODUCTION_DATA_SETUP.md"
         )
 
-    return production_data
+    return ORJSONResponse(production_data)
+
+
+@app.get("/api/lookup")
+async def lookup_point_endpoint(
+    lon: float = Query(..., ge=-180, le=180),
+    lat: float = Query(..., ge=-90, le=90),
+):
+    """
+    Find what lies under a map click.
+
+    Args:
+        lon: Longitude (WGS84)
+        lat: Latitude (WGS84)
+
+    Returns:
+        County, tract and block group (with ACS attributes where available),
+        incorporated place, and PAD-US owner_class/owner_name/unit_name
+    """
+    return ORJSONResponse(await run_io("lookup", point_lookup.point, lon, lat))
+
+
+@app.post("/api/lookup/batch")
+async def lookup_batch_endpoint(request: Request):
+    """
+    Tag many points with county, tract, block group, place and ownership.
+
+    Accepts a JSON body ({"points": [[lon, lat], ...]} or a list of
+    {"id", "lon", "lat"} objects) or CSV (Content-Type: text/csv) with
+    lon, lat and an optional id column.
+
+    Returns:
+        One result per input point, in input order: JSON {"count", "results"},
+        or CSV when the request was CSV
+    """
+    body = await request.body()
+    is_csv = request.headers.get("content-type", "").startswith("text/csv")
+
+    def lookup():
+        if is_csv:
+            ids, lons, lats = parse_points_csv(body.decode("utf-8-sig"))
+        else:
+            ids, lons, lats = parse_points_json(body)
+
+        columns = point_lookup.points(lons, lats)
+        if is_csv:
+            return Response(content=batch_csv(ids, lons, lats, columns), media_type="text/csv")
+        return ORJSONResponse({"count": len(ids), "results": batch_results(ids, lons, lats, columns)})
+
+    return await run_io("lookup", lookup)
+
+
+@app.post("/api/query/intersects")
+async def query_intersects_endpoint(
+    request: Request,
+    clip: bool = Query(False, description="Return geometries clipped to the area"),
+    acreage: bool = Query(True, description="Summarize ownership acres per owner_class"),
+):
+    """
+    Find the features of several layers inside a user-drawn area.
+
+    Body: {"geometry": GeoJSON Polygon or MultiPolygon, "layers": ["ownership", "parcels", "counties", ...]}
+
+    Returns:
+        NDJSON stream: {"layer", "feature"} per feature overlapping the area,
+        layer by layer, then a {"summary"} line with per-layer counts, the
+        area's acreage and (with ownership) acres per owner_class
+    """
+    body = await request.body()
+
+    def prepare():
+        area, names = parse_area(body)
+        return area, {name: area_query.layer(name) for name in names}
+
+    area, layers = await run_io("query", prepare)
+    return StreamingResponse(
+        iterate_io("query", area_query.records(area, layers, clip, acreage)),
+        media_type="application/x-ndjson"
+    )
+
+
+def _owner_classes(owner_class: Optional[str]) -> Optional[List[str]]:
+    """Split an owner_class query parameter (comma-separated)."""
+    return [c.strip() for c in owner_class.split(",") if c.strip()] if owner_class else None
+
+
+@app.get("/api/ownership/nearest")
+async def ownership_nearest_endpoint(
+    lon: float = Query(..., ge=-180, le=180),
+    lat: float = Query(..., ge=-90, le=90),
+    owner_class: Optional[str] = Query(None, description="Comma-separated, e.g. federal,state"),
+    k: int = Query(1, ge=1, le=settings.NEAREST_MAX_K),
+):
+    """
+    Find the nearest PAD-US units to a point.
+
+    Args:
+        lon: Longitude (WGS84)
+        lat: Latitude (WGS84)
+        owner_class: Only consider these owner classes (federal, state, local, tribal, other_public)
+        k: Number of units to return
+
+    Returns:
+        Units nearest first, with geodesic distance in meters (0 when the
+        point is inside) and the closest point on each unit
+    """
+    results = await run_io("lookup", point_lookup.nearest, lon, lat, k, _owner_classes(owner_class))
+    return ORJSONResponse({"lon": lon, "lat": lat, "results": results})
+
+
+@app.post("/api/ownership/nearest/batch")
+async def ownership_nearest_batch_endpoint(
+    request: Request,
+    owner_class: Optional[str] = Query(None, description="Comma-separated, e.g. federal,state"),
+    k: int = Query(1, ge=1, le=settings.NEAREST_MAX_K),
+):
+    """
+    Find the nearest PAD-US units for many points.
+
+    Accepts the same JSON or CSV bodies as /api/lookup/batch.
+
+    Returns:
+        {"count", "results"}: per input point, in input order, its id, lon,
+        lat and nearest units as in /api/ownership/nearest
+    """
+    body = await request.body()
+    is_csv = request.headers.get("content-type", "").startswith("text/csv")
+    classes = _owner_classes(owner_class)
+
+    def nearest():
+        if is_csv:
+            ids, lons, lats = parse_points_csv(body.decode("utf-8-sig"))
+        else:
+            ids, lons, lats = parse_points_json(body)
+        if len(ids) > settings.NEAREST_BATCH_MAX_POINTS:
+            raise HTTPException(
+                status_code=413,
+                detail=f"At most {settings.NEAREST_BATCH_MAX_POINTS} points per request"
+            )
+        return [
+            {"id": point_id, "lon": lon, "lat": lat, "nearest": point_lookup.nearest(lon, lat, k, classes)}
+            for point_id, lon, lat in zip(ids, lons.tolist(), lats.tolist())
+        ]
+
+    results = await run_io("lookup", nearest)
+    return ORJSONResponse({"count": len(results), "results": results})
+
+
+def _acs_dataset(level: str) -> Dataset:
+    """TIGER layer with ACS attributes for an API level (404 if unknown)."""
+    if level not in settings.ACS_LEVELS:
+        raise HTTPException(status_code=404, detail=f"Unknown ACS level '{level}'")
+    return tiger_layers.get(settings.ACS_LEVELS[level])
+
+
+@app.get("/api/acs/{level}/geometry")
+async def acs_geometry_endpoint(
+    request: Request,
+    level: str,
+    zoom: Optional[int] = Query(None, ge=0, le=22),
+    precision: Optional[int] = Query(None, ge=0, le=15),
+    v: Optional[str] = Query(None, description="Version token from /columns; makes the response cacheable for a year"),
+):
+    """
+    Geometry-only ACS layer.
+
+    Features carry only an integer id (their position in the layer), which
+    indexes the arrays returned by /api/acs/{level}/columns.
+
+    Args:
+        level: county, tract or blockgroup
+        zoom: Map zoom; selects a simplified level of detail
+        precision: Coordinate decimal places (default per layer)
+        v: Version token; when current, the response is marked immutable
+    """
+    dataset = _acs_dataset(level)
+    return await run_io("datasets", lambda: geometry_response(request, dataset, dataset.make_view(zoom, precision), v))
+
+
+@app.get("/api/acs/{level}/columns")
+async def acs_columns_endpoint(
+    request: Request,
+    level: str,
+    variables: str = Query(..., alias="vars", description="Comma-separated ACS attributes"),
+    v: Optional[str] = Query(None, description="Version token; makes the response cacheable for a year"),
+):
+    """
+    ACS attributes as columnar arrays aligned to the geometry layer's ids.
+
+    Args:
+        level: county, tract or blockgroup
+        vars: Attributes, e.g. median_household_income,total_population
+        v: Version token; when current, the response is marked immutable
+
+    Returns:
+        {"level", "version", "count", "columns": {variable: [value per id]}};
+        missing estimates are null
+    """
+    variables = parse_fields(variables)
+    if not variables:
+        raise HTTPException(status_code=400, detail="vars must name at least one attribute")
+    if len(variables) > settings.ACS_MAX_COLUMNS:
+        raise HTTPException(status_code=400, detail=f"At most {settings.ACS_MAX_COLUMNS} vars per request")
+    return await run_io("lookup", lambda: columns_response(request, _acs_dataset(level), level, variables, v))
+
+
+@app.get("/api/acs/{level}/{variable}/classes")
+async def acs_classes_endpoint(
+    level: str,
+    variable: str,
+    method: str = Query("quantile", pattern="^(" + "|".join(CLASS_METHODS) + ")$"),
+    classes: int = Query(settings.ACS_DEFAULT_CLASSES, ge=2, le=settings.ACS_MAX_CLASSES),
+):
+    """
+    Choropleth classes for one ACS variable.
+
+    Args:
+        level: county, tract or blockgroup
+        variable: ACS attribute, e.g. median_household_income
+        method: quantile, jenks or equal (interval)
+        classes: Number of classes
+
+    Returns:
+        Class breaks, per-class counts and a GEOID -> class index map
+    """
+    result = await run_io("lookup", lambda: classify(_acs_dataset(level), variable, method, classes))
+    return ORJSONResponse({"level": level, **result})
 
 
 @app.get("/api/eia/montana-data")
@@ -172,67 +571,58 @@ async def get_montana_eia_data():
         else:
             formatted_data[category] = []
 
-    return formatted_data
-
-
-@app.get("/data/tiger/montana_state.geojson")
-async def get_montana_state():
-    """Serve Montana state boundary from TIGER/Line"""
-    tiger_path = Path(__file__).parent.parent / "data" / "tiger" / "montana_state.geojson"
-    if not tiger_path.exists():
-        raise HTTPException(status_code=404, detail=f"State boundary not found at {tiger_path}")
-    with open(tiger_path, 'r') as f:
-        return json.load(f)
-
-
-@app.get("/data/tiger/counties.geojson")
-async def get_tiger_counties():
-    """Serve Montana counties from TIGER/Line"""
-    tiger_path = Path(__file__).parent.parent / "data" / "tiger" / "counties.geojson"
-    if not tiger_path.exists():
-        raise HTTPException(status_code=404, detail=f"Counties data not found at {tiger_path}")
-    with open(tiger_path, 'r') as f:
-        return json.load(f)
-
-
-@app.get("/data/tiger/tracts.geojson")
-async def get_tiger_tracts():
-    """Serve Montana census tracts from TIGER/Line"""
-    tiger_path = Path(__file__).parent.parent / "data" / "tiger" / "tracts.geojson"
-    if not tiger_path.exists():
-        raise HTTPException(status_code=404, detail=f"Tracts data not found at {tiger_path}")
-    with open(tiger_path, 'r') as f:
-        return json.load(f)
-
-
-@app.get("/data/tiger/blockgroups.geojson")
-async def get_tiger_blockgroups():
-    """Serve Montana census block groups from TIGER/Line"""
-    tiger_path = Path(__file__).parent.parent / "data" / "tiger" / "blockgroups.geojson"
-    if not tiger_path.exists():
-        raise HTTPException(status_code=404, detail=f"Block groups data not found at {tiger_path}")
-    with open(tiger_path, 'r') as f:
-        return json.load(f)
-
-
-@app.get("/data/tiger/places.geojson")
-async def get_tiger_places():
-    """Serve Montana incorporated places from TIGER/Line"""
-    tiger_path = Path(__file__).parent.parent / "data" / "tiger" / "places.geojson"
-    if not tiger_path.exists():
-        raise HTTPException(status_code=404, detail=f"Places data not found at {tiger_path}")
-    with open(tiger_path, 'r') as f:
-        return json.load(f)
-
-
-@app.get("/data/tiger/zipcodes.geojson")
-async def get_tiger_zipcodes():
-    """Serve Montana ZIP Code Tabulation Areas from TIGER/Line"""
-    tiger_path = Path(__file__).parent.parent / "data" / "tiger" / "zipcodes.geojson"
-    if not tiger_path.exists():
-        raise HTTPException(status_code=404, detail=f"ZIP codes data not found at {tiger_path}")
-    with open(tiger_path, 'r') as f:
-        return json.load(f)
+    return ORJSONResponse(formatted_data)
+
+
+@app.get("/data/tiger/{layer}.geojson")
+async def get_tiger_layer(
+    layer: str,
+    request: Request,
+    fmt: str = Query("geojson", alias="format", pattern="^(geojson|ndjson|fgb|arrow)$"),
+    bbox: Optional[str] = Query(None, description="minx,miny,maxx,maxy"),
+    limit: Optional[int] = Query(None, ge=1),
+    cursor: Optional[int] = Query(None, ge=0),
+    zoom: Optional[int] = Query(None, ge=0, le=24),
+    precision: Optional[int] = Query(None, ge=0, le=15),
+    fields: Optional[str] = Query(None, description="Comma-separated property names, * for all"),
+):
+    """
+    Serve a Montana TIGER/Line layer (see settings.TIGER_LAYERS).
+
+    Layers are preloaded at startup and kept pre-serialized (identity, gzip,
+    Brotli); a layer is rebuilt when its file changes. zoom, precision and
+    fields select a variant that is built once and cached the same way.
+    format=fgb/arrow return FlatGeobuf or GeoArrow IPC, converted once per
+    file version.
+    """
+    return await run_io("datasets", _dataset_response, tiger_layers.get(layer), request, fmt, bbox, limit,
+                        cursor, zoom, precision, fields)
+
+
+@app.get("/data/tiger/topology.json")
+async def get_tiger_topology(
+    request: Request,
+    layers: Optional[str] = Query(None, description="Comma-separated TIGER layer names"),
+    quantization: int = Query(settings.TOPOJSON_QUANTIZATION, description="One of settings.TOPOJSON_QUANTIZATION_LEVELS"),
+    zoom: Optional[int] = Query(None, ge=0, le=24),
+):
+    """
+    Serve TIGER layers as one TopoJSON topology.
+
+    Borders shared by neighbouring features, and by layers that nest
+    (counties, tracts, block groups), are stored once as quantized,
+    delta-encoded arcs; each layer is an object in the topology.
+
+    Args:
+        layers: Layers to combine (default settings.TOPOJSON_DEFAULT_LAYERS)
+        quantization: Integer grid size per axis (settings.TOPOJSON_QUANTIZATION_LEVELS)
+        zoom: Simplify arcs for this map zoom; shared arcs keep borders gap-free
+
+    Each combination is built once per file version; the most recently used
+    combinations are cached (layer order does not matter).
+    """
+    names = parse_fields(layers) or settings.TOPOJSON_DEFAULT_LAYERS
+    return await run_io("datasets", tiger_topology.response, request, names, quantization, zoom)
 
 
 @app.websocket("/ws/ais")
@@ -3,21 +3,93 @@ Production Database Module
 Handles SQLite database operations for well production data
 """
 
+import re
 import sqlite3
+import threading
 from pathlib import Path
-from typing import Optional, Dict, List
+from typing import Any, Optional, Dict, List
 from datetime import datetime
 import logging
+import settings
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 DB_PATH = Path(__file__).parent / "production.db"
+NON_DIGITS = re.compile(r"\D")
+
+WELL_SQL = "SELECT * FROM wells WHERE api_number = ?"
+RECENT_MONTHS_SQL = """
+    SELECT production_month, oil_bbls, gas_mcf, water_bbls, days_produced
+    FROM monthly_production
+    WHERE api_number = ?
+    ORDER BY production_month DESC
+    LIMIT 12
+"""
+BATCH_TABLE_SQL = "CREATE TEMP TABLE IF NOT EXISTS batch_wells (api_number TEXT PRIMARY KEY)"
+BATCH_WELLS_SQL = "SELECT w.* FROM wells w JOIN batch_wells b ON b.api_number = w.api_number"
+# Driven from batch_wells (CROSS JOIN keeps that order) so each well reads only
+# its newest months from the (api_number, production_month) index
+BATCH_MONTHS_SQL = """
+    SELECT m.api_number, m.production_month, m.oil_bbls, m.gas_mcf, m.water_bbls, m.days_produced
+    FROM batch_wells b
+    CROSS JOIN monthly_production m ON m.rowid IN (
+        SELECT rowid FROM monthly_production
+        WHERE api_number = b.api_number
+        ORDER BY production_month DESC
+        LIMIT ?
+    )
+    ORDER BY m.api_number, m.production_month DESC
+"""
+UPSERT_WELL_SQL = """
+    INSERT OR REPLACE INTO wells
+    (api_number, well_name, operator, status, field, county,
+     first_production_date, last_production_date,
+     total_oil_bbls, total_gas_mcf, total_water_bbls,
+     avg_daily_oil, avg_daily_gas, last_updated)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+UPSERT_MONTH_SQL = """
+    INSERT OR REPLACE INTO monthly_production
+    (api_number, production_month, oil_bbls, gas_mcf, water_bbls, days_produced)
+    VALUES (?, ?, ?, ?, ?, ?)
+"""
+
+_local = threading.local()
+
+
+def get_connection() -> sqlite3.Connection:
+    """
+    This thread's long-lived connection to the production database.
+
+    Connections are opened once per thread (sqlite3 connections must not be
+    shared between threads) and keep their compiled statements, so the
+    module-level SQL strings above are prepared only once per thread. The
+    database runs in WAL mode, so readers are never blocked by an import
+    and an import only waits for other writers.
+    """
+    conn = getattr(_local, "conn", None)
+    if conn is None:
+        conn = sqlite3.connect(DB_PATH, cached_statements=settings.PRODUCTION_DB_CACHED_STATEMENTS)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode = WAL")
+        for pragma, value in settings.PRODUCTION_DB_PRAGMAS.items():
+            conn.execute(f"PRAGMA {pragma} = {value}")
+        _local.conn = conn
+    return conn
+
+
+def close_connection():
+    """Close this thread's connection (e.g. before replacing the database file)."""
+    conn = getattr(_local, "conn", None)
+    if conn is not None:
+        conn.close()
+        _local.conn = None
 
 
 def init_database():
     """Initialize the production database schema"""
-    conn = sqlite3.connect(DB_PATH)
+    conn = get_connection()
     cursor = conn.cursor()
 
     # Wells table
@@ -60,50 +132,92 @@ def init_database():
     cursor.execute("CREATE INDEX IF NOT EXISTS idx_month ON monthly_production(production_month)")
 
     conn.commit()
-    conn.close()
     logger.info(f"✓ Database initialized at {DB_PATH}")
 
 
+def normalize_api_number(value: Any) -> Optional[str]:
+    """
+    API well number in the form production.db stores it: digits only, so
+    25-083-21234 and 2508321234 name the same well. Numeric values (e.g. a
+    GeoJSON property read as a float) lose any ".0".
+
+    Returns:
+        The digits, or None when there are none (or only zeros)
+    """
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    if value is None:
+        return None
+    digits = NON_DIGITS.sub("", str(value))
+    return digits if digits.strip("0") else None
+
+
 def get_well_production(api_number: str) -> Optional[Dict]:
     """
     Get production data for a specific well by API number.
 
     Args:
-        api_number: Well API number
+        api_number: Well API number, with or without dashes
 
     Returns:
         Dictionary with production data or None if not found
     """
-    conn = sqlite3.connect(DB_PATH)
-    conn.row_factory = sqlite3.Row
-    cursor = conn.cursor()
-
-    # Get well summary
-    cursor.execute("""
-        SELECT *
-        FROM wells
-        WHERE api_number = ?
-    """, (str(api_number),))
-
-    well = cursor.execute("SELECT * FROM wells WHERE api_number = ?", (str(api_number),)).fetchone()
+    api_number = normalize_api_number(api_number)
+    if api_number is None:
+        return None
+    conn = get_connection()
 
+    well = conn.execute(WELL_SQL, (api_number,)).fetchone()
     if not well:
-        conn.close()
         return None
 
-    # Get recent monthly production (last 12 months)
-    cursor.execute("""
-        SELECT production_month, oil_bbls, gas_mcf, water_bbls, days_produced
-        FROM monthly_production
-        WHERE api_number = ?
-        ORDER BY production_month DESC
-        LIMIT 12
-    """, (str(api_number),))
+    # Recent monthly production (last 12 months)
+    monthly_data = [dict(row) for row in conn.execute(RECENT_MONTHS_SQL, (api_number,))]
+
+    return _well_summary(well, monthly_data)
+
+
+def get_wells_production(api_numbers: List[str], months: int = 0) -> Dict[str, Dict]:
+    """
+    Get production data for many wells in one pass.
+
+    The API numbers are loaded into a temporary table and joined against
+    wells and monthly_production, so the work is two set-based queries
+    whatever the number of wells; both read the same snapshot.
+
+    Args:
+        api_numbers: Well API numbers, with or without dashes
+        months: Recent months of production to include per well (0: none)
+
+    Returns:
+        API number as given -> dictionary as from get_well_production()
+        (monthly_data holds up to months records); wells not in the database
+        are left out
+    """
+    keys = {str(a): normalize_api_number(a) for a in api_numbers}
+    conn = get_connection()
+    conn.execute(BATCH_TABLE_SQL)
 
-    monthly_data = [dict(row) for row in cursor.fetchall()]
+    with conn:
+        conn.execute("DELETE FROM batch_wells")
+        conn.executemany("INSERT OR IGNORE INTO batch_wells VALUES (?)",
+                         ((key,) for key in keys.values() if key is not None))
 
-    conn.close()
+        wells = conn.execute(BATCH_WELLS_SQL).fetchall()
+        monthly: Dict[str, List[Dict]] = {well['api_number']: [] for well in wells}
+        if months > 0:
+            for row in conn.execute(BATCH_MONTHS_SQL, (months,)):
+                record = dict(row)
+                monthly[record.pop('api_number')].append(record)
 
+        conn.execute("DELETE FROM batch_wells")
+
+    found = {well['api_number']: _well_summary(well, monthly[well['api_number']]) for well in wells}
+    return {a: found[key] for a, key in keys.items() if key in found}
+
+
+def _well_summary(well: sqlite3.Row, monthly_data: List[Dict]) -> Dict:
+    """API response for a wells row and its monthly records."""
     return {
         'api_number': well['api_number'],
         'well_name': well['well_name'],
@@ -131,19 +245,18 @@ def insert_production_data(well_data: Dict, monthly_data: List[Dict]):
         well_data: Dictionary with well information
         monthly_data: List of monthly production records
     """
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
+    conn = get_connection()
 
-    # Insert or update well
-    cursor.execute("""
-        INSERT OR REPLACE INTO wells
-        (api_number, well_name, operator, status, field, county,
-         first_production_date, last_production_date,
-         total_oil_bbls, total_gas_mcf, total_water_bbls,
-         avg_daily_oil, avg_daily_gas, last_updated)
-        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-    """, (
-        well_data['api_number'],
+    # One transaction per well; readers keep seeing the previous version until it commits
+    with conn:
+        _upsert_well(conn, well_data, monthly_data)
+
+
+def _upsert_well(conn: sqlite3.Connection, well_data: Dict, monthly_data: List[Dict]):
+    """Write one well and its monthly records (the caller owns the transaction)."""
+    api_number = normalize_api_number(well_data['api_number'])
+    conn.execute(UPSERT_WELL_SQL, (
+        api_number,
         well_data.get('well_name'),
         well_data.get('operator'),
         well_data.get('status'),
@@ -160,28 +273,22 @@ def insert_production_data(well_data: Dict, monthly_data: List[Dict]):
     ))
 
     # Insert monthly data
-    for month in monthly_data:
-        cursor.execute("""
-            INSERT OR REPLACE INTO monthly_production
-            (api_number, production_month, oil_bbls, gas_mcf, water_bbls, days_produced)
-            VALUES (?, ?, ?, ?, ?, ?)
-        """, (
-            well_data['api_number'],
+    conn.executemany(UPSERT_MONTH_SQL, (
+        (
+            api_number,
             month['production_month'],
             month.get('oil_bbls', 0),
             month.get('gas_mcf', 0),
             month.get('water_bbls', 0),
             month.get('days_produced', 0)
-        ))
-
-    conn.commit()
-    conn.close()
+        )
+        for month in monthly_data
+    ))
 
 
 def get_database_stats() -> Dict:
     """Get statistics about the production database"""
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
+    cursor = get_connection().cursor()
 
     stats = {}
 
@@ -199,7 +306,6 @@ def get_database_stats() -> Dict:
     stats['earliest_month'] = date_range[0]
     stats['latest_month'] = date_range[1]
 
-    conn.close()
     return stats
 
 
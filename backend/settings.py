@@ -7,6 +7,24 @@ from pathlib import Path
 # Paths
 BASE_DIR = Path(__file__).parent.parent
 MBTILES_PATH = BASE_DIR / "data" / "tiles" / "ownership.mbtiles"
+WELLS_MBTILES_PATH = BASE_DIR / "data" / "tiles" / "wells.mbtiles"
+OWNERSHIP_NDJSON_PATH = BASE_DIR / "data" / "padus" / "padus_clean.ndjson"
+PARCELS_GEOJSON_PATH = BASE_DIR / "data" / "parcels" / "test_parcels.geojson"
+TIGER_DIR = BASE_DIR / "data" / "tiger"
+STATIC_DATA_DIR = BASE_DIR / "data" / "static"  # built by scripts/build_static_data.py
+
+# TIGER layers served at /data/tiger/{layer}.geojson (layer name -> file in TIGER_DIR)
+TIGER_LAYERS = {
+    "montana_state": "montana_state.geojson",
+    "counties": "counties.geojson",
+    "tracts": "tracts.geojson",
+    "blockgroups": "blockgroups.geojson",
+    "places": "places.geojson",
+    "zipcodes": "zipcodes.geojson",
+    "counties_acs": "mt_counties_acs.geojson",
+    "tracts_acs": "mt_tracts_acs.geojson",
+    "blockgroups_acs": "mt_blockgroups_acs.geojson",
+}
 
 # CORS
 ALLOWED_ORIGINS = [
@@ -23,4 +41,148 @@ ALLOWED_ORIGINS = [
 ]
 
 # Cache
-TILE_CACHE_MAX_AGE = 31536000  # 1 year in seconds
\ No newline at end of file
+TILE_CACHE_MAX_AGE = 31536000  # 1 year in seconds
+
+# Dynamic TIGER vector tiles (/tiles/tiger/{layer}/{z}/{x}/{y}.pbf)
+VECTOR_TILE_EXTENT = 4096
+VECTOR_TILE_BUFFER = 64  # pixels outside the tile kept so strokes join across edges
+VECTOR_TILE_SIMPLIFY_PIXELS = 1.0
+VECTOR_TILE_MAX_ZOOM = 16
+VECTOR_TILE_CACHE_SIZE = 4096  # tiles per layer
+VECTOR_TILE_MAX_AGE = 3600  # generated from files that can change, so not immutable
+
+# GeoJSON datasets
+GEOJSON_GZIP_LEVEL = 6
+GEOJSON_BROTLI_QUALITY = 9
+DATASET_STAT_INTERVAL = 2.0  # seconds between file change checks
+DATASET_CACHE_CONTROL = "public, max-age=60, must-revalidate"
+DATASET_CACHE_VERSION = 1  # part of every dataset ETag; bump when serialized output changes
+GEOJSON_CACHE_MAX_BYTES = 64 * 1024 * 1024  # larger files are streamed, not cached
+DATASET_VIEW_CACHE_ENTRIES = 16  # derivatives of non-default ?precision=/?fields= views kept per dataset (LRU)
+
+# Per-layer defaults for ?precision= (decimal places) and ?fields= (property
+# names). None keeps full precision / every property. Keys are dataset names:
+# "ownership", "parcels" and the TIGER_LAYERS names.
+GEOJSON_LAYER_DEFAULTS = {
+    "ownership": {"precision": 6, "fields": None},
+    "parcels": {"precision": 6, "fields": None},
+    "montana_state": {"precision": 5, "fields": None},
+    "counties": {"precision": 5, "fields": None},
+    "tracts": {"precision": 6, "fields": None},
+    "blockgroups": {"precision": 6, "fields": None},
+    "places": {"precision": 6, "fields": None},
+    "zipcodes": {"precision": 5, "fields": None},
+    "counties_acs": {"precision": 5, "fields": None},
+    "tracts_acs": {"precision": 6, "fields": None},
+    "blockgroups_acs": {"precision": 6, "fields": None},
+}
+
+# Level of detail: max zoom -> simplification tolerance (degrees).
+# Zooms above the last tier get full-detail geometry.
+LOD_TOLERANCES = {
+    6: 0.01,
+    8: 0.003,
+    10: 0.001,
+}
+
+# TopoJSON (/data/tiger/topology.json): default layers share one topology,
+# built at startup; block groups have no ACS file yet
+TOPOJSON_DEFAULT_LAYERS = ["counties_acs", "tracts_acs", "blockgroups"]
+TOPOJSON_QUANTIZATION = 100000
+TOPOJSON_QUANTIZATION_LEVELS = [10000, 100000, 1000000]  # accepted ?quantization= values
+TOPOJSON_CACHE_ENTRIES = 8  # layer/quantization/LOD combinations kept (LRU)
+
+# Point lookup: result key -> TIGER_LAYERS names, first existing file wins
+LOOKUP_LAYERS = {
+    "county": ["counties_acs", "counties"],
+    "tract": ["tracts_acs", "tracts"],
+    "blockgroup": ["blockgroups_acs", "blockgroups"],
+    "place": ["places"],
+}
+LOOKUP_OWNERSHIP_FIELDS = ["owner_class", "owner_name", "unit_name"]
+
+# Batch lookup output: (column, lookup key, source property)
+LOOKUP_BATCH_COLUMNS = [
+    ("county_geoid", "county", "GEOID"),
+    ("county_name", "county", "NAME"),
+    ("tract_geoid", "tract", "GEOID"),
+    ("blockgroup_geoid", "blockgroup", "GEOID"),
+    ("place_name", "place", "NAME"),
+    ("owner_class", "ownership", "owner_class"),
+    ("unit_name", "ownership", "unit_name"),
+]
+LOOKUP_BATCH_MAX_POINTS = 500000
+
+# Area-of-interest query (/api/query/intersects): NDJSON lines per streamed chunk
+AREA_QUERY_BATCH_SIZE = 500
+
+# Nearest PAD-US units (/api/ownership/nearest): search radius grows from
+# the start radius until k units are found or the max radius is reached
+NEAREST_START_RADIUS_M = 10000
+NEAREST_MAX_RADIUS_M = 1000000
+NEAREST_MAX_K = 50
+NEAREST_BATCH_MAX_POINTS = 10000
+
+# ACS choropleth classification: API level -> TIGER layer with ACS attributes
+ACS_LEVELS = {
+    "county": "counties_acs",
+    "tract": "tracts_acs",
+    "blockgroup": "blockgroups_acs",
+}
+ACS_DEFAULT_CLASSES = 5
+ACS_MAX_CLASSES = 9
+
+# Split ACS delivery (/api/acs/{level}/geometry and /columns): URLs carrying the
+# current ?v= version token are cached for a year
+ACS_IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+ACS_MAX_COLUMNS = 50
+
+# Production database (production_db.py): per-thread connections in WAL mode.
+# cache_size is negative KiB; mmap lets reads of hot pages skip the page cache copy
+PRODUCTION_DB_CACHED_STATEMENTS = 64
+PRODUCTION_DB_PRAGMAS = {
+    "synchronous": "NORMAL",        # safe with WAL; fsync only at checkpoints
+    "cache_size": -32768,           # 32 MiB page cache per connection
+    "mmap_size": 268435456,         # 256 MiB
+    "temp_store": "MEMORY",
+    "busy_timeout": 5000,           # ms a writer waits for another writer
+}
+
+# Production importer (import_production.py): lines per worker parse task,
+# days assumed for a month without a days-produced figure, and the export
+# header names accepted for each field (compared ignoring case and punctuation)
+PRODUCTION_IMPORT_CHUNK_ROWS = 50000
+PRODUCTION_IMPORT_CHUNKS_PER_WORKER = 2  # parsed chunks in flight per worker, waiting for the writer
+PRODUCTION_IMPORT_DAYS_PER_MONTH = 30.4375
+PRODUCTION_IMPORT_COLUMNS = {
+    "api_number": ["API_WellNo", "API Number", "API", "API No", "Well API"],
+    "well_name": ["Well_Nm", "Well Name", "Lease", "Lease Name"],
+    "operator": ["CoName", "Operator", "Operator Name", "Company"],
+    "status": ["Status", "Well Status"],
+    "field": ["Field", "Field Name", "Fld_Nm"],
+    "county": ["County", "County Name", "Cnty"],
+    "production_month": ["Rpt_Date", "Report Date", "Production Month", "Prod Month", "Period", "Prod Date"],
+    "year": ["Year", "Yr", "Prod Year"],
+    "month": ["Month", "Mo"],
+    "oil_bbls": ["BBLS_OIL_COND", "Oil", "Oil BBLS", "Oil Production", "Oil Production (BBL)", "Oil (BBL)"],
+    "gas_mcf": ["MCF_GAS", "Gas", "Gas MCF", "Gas Production", "Gas Production (MCF)", "Gas (MCF)"],
+    "water_bbls": ["BBLS_WTR", "Water", "Water BBLS", "Water Production", "Water Production (BBL)", "Water (BBL)"],
+    "days_produced": ["Days_Prod", "Days Produced", "Days", "Days On"],
+}
+
+# Batch well production (/api/well-production/batch)
+PRODUCTION_BATCH_MAX_WELLS = 5000
+PRODUCTION_BATCH_MAX_MONTHS = 600
+
+# Blocking I/O executor (io_executor.py): worker threads shared by all
+# endpoints, and the most calls each endpoint group may run at once. Keep the
+# sum of the limits at or below the pool size so no group can starve another.
+IO_THREAD_POOL_SIZE = 24
+IO_CONCURRENCY_LIMITS = {
+    "tiles": 8,        # MBTiles reads and dynamic TIGER tiles
+    "datasets": 4,     # GeoJSON/NDJSON/FlatGeobuf/Arrow and TopoJSON responses
+    "lookup": 4,       # point, batch and nearest lookups, ACS classes and columns
+    "query": 2,        # area-of-interest queries
+    "database": 4,     # production database
+    "startup": 2,      # preloading at startup
+}
@@ -0,0 +1,171 @@
+"""
+Spatial Index
+STRtree-backed bounding box and point queries over dataset geometries
+"""
+
+from typing import Optional, Tuple
+import numpy as np
+import shapely
+from shapely import STRtree
+from fastapi import HTTPException
+
+BBox = Tuple[float, float, float, float]
+
+EARTH_RADIUS_M = 6371008.8  # mean Earth radius (IUGG)
+METERS_PER_DEGREE_LAT = 111320.0
+SQUARE_METERS_PER_ACRE = 4046.8564224
+
+
+def parse_bbox(bbox: str) -> BBox:
+    """
+    Parse a "minx,miny,maxx,maxy" query parameter.
+
+    Raises:
+        HTTPException 400 if the value is not four ordered numbers
+    """
+    try:
+        minx, miny, maxx, maxy = (float(v) for v in bbox.split(","))
+    except ValueError:
+        raise HTTPException(status_code=400, detail="bbox must be minx,miny,maxx,maxy")
+
+    if minx > maxx or miny > maxy:
+        raise HTTPException(status_code=400, detail="bbox min values must not exceed max values")
+
+    return minx, miny, maxx, maxy
+
+
+def geodesic_distance(lon: float, lat: float, lons: np.ndarray, lats: np.ndarray) -> np.ndarray:
+    """Great-circle (haversine) distance in meters from one point to many."""
+    lon1, lat1 = np.radians(lon), np.radians(lat)
+    lon2, lat2 = np.radians(lons), np.radians(lats)
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_M * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+
+def area_acres(geometries: np.ndarray, central_lon: float) -> np.ndarray:
+    """
+    Areas in acres of WGS84 geometries, measured on the sphere.
+
+    Coordinates are projected to a sinusoidal (equal-area) projection around
+    central_lon, so planar areas there equal areas on the sphere.
+    """
+    def project(coords):
+        lat = np.radians(coords[:, 1])
+        return np.column_stack([
+            EARTH_RADIUS_M * np.radians(coords[:, 0] - central_lon) * np.cos(lat),
+            EARTH_RADIUS_M * lat,
+        ])
+
+    return shapely.area(shapely.transform(geometries, project)) / SQUARE_METERS_PER_ACRE
+
+
+class SpatialIndex:
+    """STRtree over a dataset's features, built once per dataset load."""
+
+    def __init__(self, geometries: np.ndarray):
+        # Features without geometry are None and never match a query
+        self.geometries = geometries
+        # Prepared geometries make repeated predicate tests against them cheap
+        shapely.prepare(self.geometries)
+        self.tree = STRtree(self.geometries)
+
+    def query(self, bbox: BBox, limit: Optional[int] = None,
+              cursor: Optional[int] = None) -> Tuple[np.ndarray, Optional[int]]:
+        """
+        Find features intersecting bbox, in dataset order.
+
+        Args:
+            bbox: (minx, miny, maxx, maxy) in WGS84
+            limit: Maximum number of features to return
+            cursor: next_cursor from a previous page; only later features are returned
+
+        Returns:
+            (feature indices, next_cursor or None when there are no more results)
+        """
+        indices = np.sort(self.tree.query(shapely.box(*bbox), predicate="intersects"))
+        if cursor is not None:
+            indices = indices[indices > cursor]
+
+        next_cursor = None
+        if limit is not None and len(indices) > limit:
+            indices = indices[:limit]
+            next_cursor = int(indices[-1])
+
+        return indices, next_cursor
+
+    def first_containing(self, points: np.ndarray) -> np.ndarray:
+        """
+        For each point, the lowest index of a feature containing it (-1 for none).
+
+        One bulk STRtree query finds bounding-box candidates; the predicate is then
+        tested against the prepared feature geometries in a single vectorized call.
+        """
+        inputs, targets = self.tree.query(points)
+        hits = shapely.intersects(self.geometries[targets], points[inputs])
+        inputs, targets = inputs[hits], targets[hits]
+        result = np.full(len(points), -1, dtype=np.int64)
+        order = np.lexsort((targets, inputs))
+        inputs, targets = inputs[order], targets[order]
+        _, first = np.unique(inputs, return_index=True)
+        result[inputs[first]] = targets[first]
+        return result
+
+    def nearest(self, lon: float, lat: float, k: int, mask: Optional[np.ndarray] = None,
+                start_radius_m: float = 10000.0, max_radius_m: float = 1000000.0
+                ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        The k features nearest to a point, by geodesic distance.
+
+        Searches a box around the point that grows until it holds k features
+        within its radius. Candidates are measured in a local frame scaled by
+        cos(lat), so the closest point on each geometry is found correctly
+        away from the equator; its distance is then taken on the sphere.
+
+        Args:
+            mask: Only consider features where mask is True
+            start_radius_m, max_radius_m: Search radius bounds in meters
+
+        Returns:
+            (feature indices, distances in meters, closest points as lon/lat rows), nearest first
+        """
+        scale = max(np.cos(np.radians(lat)), 0.01)
+        radius = start_radius_m
+        while True:
+            dlat = radius / METERS_PER_DEGREE_LAT
+            dlon = dlat / scale
+            candidates = self.tree.query(shapely.box(lon - dlon, lat - dlat, lon + dlon, lat + dlat))
+            if mask is not None:
+                candidates = candidates[mask[candidates]]
+            candidates = np.sort(candidates)
+
+            local = shapely.transform(self.geometries[candidates], lambda c: (c - (lon, lat)) * (scale, 1.0))
+            closest = shapely.get_coordinates(
+                shapely.get_point(shapely.shortest_line(local, shapely.Point(0, 0)), 0)
+            ) / (scale, 1.0) + (lon, lat)
+            distances = geodesic_distance(lon, lat, closest[:, 0], closest[:, 1])
+
+            within = distances <= radius
+            if within.sum() >= k or radius >= max_radius_m:
+                break
+            radius = min(radius * 4, max_radius_m)
+
+        order = np.argsort(distances[within], kind="stable")[:k]
+        return candidates[within][order], distances[within][order], closest[within][order]
+
+    def intersecting(self, geometry) -> np.ndarray:
+        """
+        Indices of the features overlapping a geometry, in dataset order;
+        features that only touch its boundary are left out.
+
+        The STRtree narrows the features to bounding-box candidates, which are
+        then tested against the prepared query geometry in one vectorized call.
+        """
+        shapely.prepare(geometry)
+        candidates = np.sort(self.tree.query(geometry))
+        hits = candidates[shapely.intersects(geometry, self.geometries[candidates])]
+        return hits[~shapely.touches(geometry, self.geometries[hits])]
+
+    def containing(self, point: shapely.Point) -> np.ndarray:
+        """Indices of the features containing (or touching) a point, in dataset order."""
+        candidates = np.sort(self.tree.query(point))
+        return candidates[shapely.intersects(self.geometries[candidates], point)]
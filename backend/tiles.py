@@ -4,29 +4,31 @@ Serves MBTiles via HTTP endpoints
 """
 
 import sqlite3
+import threading
 from pathlib import Path
 from fastapi import HTTPException
 from fastapi.responses import Response
 import settings
+from io_executor import run_io
 
 
 class TileServer:
     def __init__(self, mbtiles_path: Path):
         self.mbtiles_path = mbtiles_path
-        self._connection = None
+        # One read-only connection per I/O executor thread; sqlite3 connections
+        # must not be used by two threads at once
+        self._local = threading.local()
 
     def _get_connection(self):
-        """Get or create database connection."""
-        if self._connection is None:
+        """Get or create this thread's database connection."""
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
             if not self.mbtiles_path.exists():
                 raise FileNotFoundError(f"MBTiles file not found: {self.mbtiles_path}")
 
-            self._connection = sqlite3.connect(
-                str(self.mbtiles_path),
-                check_same_thread=False,
-                uri=True
-            )
-        return self._connection
+            connection = sqlite3.connect(f"{self.mbtiles_path.resolve().as_uri()}?mode=ro", uri=True)
+            self._local.connection = connection
+        return connection
 
     def get_tile(self, z: int, x: int, y: int) -> bytes:
         """
@@ -59,18 +61,15 @@ class TileServer:
         return row[0]
 
 
-# Global tile server instance
+# Global tile server instances
 tile_server = TileServer(settings.MBTILES_PATH)
+wells_tile_server = TileServer(settings.WELLS_MBTILES_PATH)
 
 
-async def get_ownership_tile(z: int, x: int, y: int):
-    """
-    FastAPI endpoint for ownership tiles.
-
-    GET /tiles/ownership/{z}/{x}/{y}.pbf
-    """
+def _tile_response(server: TileServer, z: int, x: int, y: int):
+    """Look up a tile and wrap it in a cacheable gzipped protobuf response."""
     try:
-        tile_data = tile_server.get_tile(z, x, y)
+        tile_data = server.get_tile(z, x, y)
 
         return Response(
             content=tile_data,
@@ -87,4 +86,22 @@ async def get_ownership_tile(z: int, x: int, y: int):
     except HTTPException:
         raise
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error retrieving tile: {str(e)}")
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=f"Error retrieving tile: {str(e)}")
+
+
+async def get_ownership_tile(z: int, x: int, y: int):
+    """
+    FastAPI endpoint for ownership tiles.
+
+    GET /tiles/ownership/{z}/{x}/{y}.pbf
+    """
+    return await run_io("tiles", _tile_response, tile_server, z, x, y)
+
+
+async def get_wells_tile(z: int, x: int, y: int):
+    """
+    FastAPI endpoint for wells tiles (clustered below z12, individual wells above).
+
+    GET /tiles/wells/{z}/{x}/{y}.pbf
+    """
+    return await run_io("tiles", _tile_response, wells_tile_server, z, x, y)
@@ -0,0 +1,293 @@
+"""
+TopoJSON Encoding
+Shared-arc, quantized, delta-encoded TopoJSON for the TIGER boundary layers
+"""
+
+import gzip
+import hashlib
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Dict, List, Optional, Sequence, Tuple
+import numpy as np
+import orjson
+import shapely
+from fastapi import HTTPException, Request
+from fastapi.responses import Response
+import settings
+from datasets import Dataset, DatasetRegistry, accepts_encoding, is_fresh, lod_tolerance
+
+
+def _quantize(coords: np.ndarray, bbox: Sequence[float], quantization: int) -> Tuple[np.ndarray, List[float]]:
+    """Snap coordinates to a quantization x quantization grid over bbox; returns int64 point codes."""
+    x0, y0, x1, y1 = bbox
+    kx = (x1 - x0) / (quantization - 1) or 1.0
+    ky = (y1 - y0) / (quantization - 1) or 1.0
+    qx = np.round((coords[:, 0] - x0) / kx).astype(np.int64)
+    qy = np.round((coords[:, 1] - y0) / ky).astype(np.int64)
+    return qx * quantization + qy, [kx, ky]
+
+
+def _rings(geometries: np.ndarray, bbox: Sequence[float], quantization: int):
+    """
+    Quantized rings of all polygons, as open arrays of point codes.
+
+    Returns:
+        (rings, ring index per polygon part, polygon parts per geometry, scale)
+    """
+    polygons = geometries.copy()
+    polygons[shapely.is_missing(polygons)] = shapely.from_wkt("MULTIPOLYGON EMPTY")
+    _, coords, (ring_offsets, part_offsets, geom_offsets) = shapely.to_ragged_array(_as_multipolygons(polygons))
+    codes, scale = _quantize(coords, bbox, quantization)
+
+    rings = []
+    for start, end in zip(ring_offsets[:-1], ring_offsets[1:]):
+        ring = codes[start:end - 1]  # drop the closing point
+        # Collapse vertices that snapped onto the same grid cell
+        keep = ring != np.roll(ring, 1)
+        ring = ring[keep] if keep.any() else ring[:1]
+        rings.append(ring)
+    return rings, part_offsets, geom_offsets, scale
+
+
+def _as_multipolygons(geometries: np.ndarray) -> np.ndarray:
+    """Promote Polygons to MultiPolygons so to_ragged_array sees one geometry type."""
+    is_polygon = shapely.get_type_id(geometries) == 3
+    promoted = geometries.copy()
+    promoted[is_polygon] = [shapely.MultiPolygon([g]) for g in geometries[is_polygon]]
+    return promoted
+
+
+def _junctions(rings: List[np.ndarray]) -> np.ndarray:
+    """
+    Points where rings meet or split: a point is a junction when its
+    occurrences do not all have the same (unordered) pair of neighbours.
+    """
+    lengths = [len(ring) for ring in rings]
+    if not sum(lengths):
+        return np.empty(0, dtype=np.int64)
+    points = np.concatenate(rings)
+    prev = np.concatenate([np.roll(ring, 1) for ring in rings])
+    nxt = np.concatenate([np.roll(ring, -1) for ring in rings])
+    low, high = np.minimum(prev, nxt), np.maximum(prev, nxt)
+
+    order = np.lexsort((high, low, points))
+    points, low, high = points[order], low[order], high[order]
+    new_pair = np.r_[True, (points[1:] != points[:-1]) | (low[1:] != low[:-1]) | (high[1:] != high[:-1])]
+    candidates, pair_counts = np.unique(points[new_pair], return_counts=True)
+    return candidates[pair_counts > 1]
+
+
+class ArcTable:
+    """Deduplicated arcs; a reversed duplicate is referenced as ~index."""
+
+    def __init__(self):
+        self.arcs: List[np.ndarray] = []
+        self._index: Dict[bytes, int] = {}
+
+    def add(self, arc: np.ndarray) -> int:
+        key = arc.tobytes()
+        if key in self._index:
+            return self._index[key]
+        reverse_key = arc[::-1].tobytes()
+        if reverse_key in self._index:
+            return ~self._index[reverse_key]
+        self._index[key] = len(self.arcs)
+        self.arcs.append(arc)
+        return self._index[key]
+
+    def ring(self, ring: np.ndarray, is_junction: np.ndarray) -> List[int]:
+        """Cut a ring at its junctions and return its arc references."""
+        cuts = np.flatnonzero(is_junction)
+        if not len(cuts):
+            # No junctions: start at the smallest point so identical rings share one arc
+            ring = np.roll(ring, -int(np.argmin(ring)))
+            return [self.add(np.r_[ring, ring[:1]])]
+
+        ring = np.roll(ring, -int(cuts[0]))
+        closed = np.r_[ring, ring[:1]]
+        bounds = np.r_[cuts - cuts[0], len(ring)]
+        return [self.add(closed[start:end + 1]) for start, end in zip(bounds[:-1], bounds[1:])]
+
+
+def _encode_arcs(arcs: List[np.ndarray], quantization: int, tolerance: Optional[float]) -> List[List]:
+    """Delta-encode arcs, simplifying each one (endpoints fixed) when a tolerance is given."""
+    decoded = [np.column_stack([arc // quantization, arc % quantization]) for arc in arcs]
+
+    if tolerance:
+        lines = shapely.simplify(shapely.linestrings(
+            np.concatenate(decoded), indices=np.repeat(np.arange(len(decoded)), [len(arc) for arc in decoded])
+        ), tolerance)
+        simplified = []
+        for arc, line in zip(decoded, lines):
+            coords = shapely.get_coordinates(line).astype(np.int64)
+            # Keep closed arcs (islands, enclaves) from collapsing below a ring
+            closed = len(arc) > 2 and (arc[0] == arc[-1]).all()
+            simplified.append(arc if closed and len(coords) < 4 else coords)
+        decoded = simplified
+
+    return [np.r_[arc[:1], np.diff(arc, axis=0)].tolist() for arc in decoded]
+
+
+def build_topology(layers: Dict[str, Dataset], quantization: int,
+                   tolerance: Optional[float] = None) -> Dict:
+    """
+    Build one TopoJSON topology with an object per layer.
+
+    Borders shared between features (and between layers, where they line up)
+    become a single arc, so simplifying arcs keeps neighbours gap-free.
+
+    Args:
+        layers: Object name -> dataset
+        quantization: Grid size per axis for integer coordinates
+        tolerance: Arc simplification tolerance in degrees (None: full detail)
+
+    Returns:
+        TopoJSON Topology dictionary
+    """
+    geometries = [layer.spatial_index().geometries for layer in layers.values()]
+    all_geometries = np.concatenate(geometries)
+    bbox = shapely.total_bounds(all_geometries).tolist()
+
+    rings, part_offsets, geom_offsets, scale = _rings(all_geometries, bbox, quantization)
+    junctions = _junctions([ring for ring in rings if len(ring) >= 3])
+
+    table = ArcTable()
+    ring_arcs = [
+        table.ring(ring, np.isin(ring, junctions)) if len(ring) >= 3 else None
+        for ring in rings
+    ]
+
+    objects = {}
+    type_ids = shapely.get_type_id(all_geometries)
+    feature = 0
+    for name, layer_geometries, dataset in zip(layers, geometries, layers.values()):
+        properties = dataset.properties()
+        output = []
+        for i in range(len(layer_geometries)):
+            polygons = []
+            for part in range(geom_offsets[feature], geom_offsets[feature + 1]):
+                part_rings = [ring_arcs[r] for r in range(part_offsets[part], part_offsets[part + 1])]
+                if part_rings and part_rings[0] is not None:
+                    polygons.append([arcs for arcs in part_rings if arcs is not None])
+
+            geometry = {"type": None}
+            if polygons:
+                geometry = (
+                    {"type": "Polygon", "arcs": polygons[0]}
+                    if type_ids[feature] == 3 and len(polygons) == 1
+                    else {"type": "MultiPolygon", "arcs": polygons}
+                )
+            geometry["properties"] = properties[i]
+            if "GEOID" in properties[i]:
+                geometry["id"] = properties[i]["GEOID"]
+            output.append(geometry)
+            feature += 1
+
+        objects[name] = {"type": "GeometryCollection", "geometries": output}
+
+    tolerance_units = tolerance / min(scale) if tolerance else None
+    return {
+        "type": "Topology",
+        "bbox": bbox,
+        "transform": {"scale": scale, "translate": bbox[:2]},
+        "objects": objects,
+        "arcs": _encode_arcs(table.arcs, quantization, tolerance_units),
+    }
+
+
+class TopologyCache:
+    """
+    Encoded topologies of registry layer combinations, rebuilt when a layer file changes.
+
+    The most recently used TOPOJSON_CACHE_ENTRIES combinations are kept.
+    Each is built once: concurrent requests for a combination that is being
+    built wait for that build, and other combinations are not held up.
+    """
+
+    def __init__(self, registry: DatasetRegistry):
+        self.registry = registry
+        self._lock = threading.Lock()
+        self._cache: OrderedDict[Tuple, Tuple[str, Future]] = OrderedDict()
+
+    def _resolve(self, names: Sequence[str], quantization: int,
+                 zoom: Optional[int] = None) -> Tuple[Dict[str, Dataset], Tuple, str]:
+        """
+        Layers, cache key and ETag for a combination of layers, from the
+        layer validators alone (nothing is built).
+
+        Raises:
+            HTTPException 400 for a quantization not in TOPOJSON_QUANTIZATION_LEVELS
+            HTTPException 404 for unknown or missing layers
+        """
+        if quantization not in settings.TOPOJSON_QUANTIZATION_LEVELS:
+            levels = ", ".join(str(q) for q in settings.TOPOJSON_QUANTIZATION_LEVELS)
+            raise HTTPException(status_code=400, detail=f"quantization must be one of {levels}")
+        names = tuple(sorted(set(names)))
+        layers = {name: self.registry.get(name) for name in names}
+        etags = [dataset.validators()[0] for dataset in layers.values()]
+        tolerance = lod_tolerance(zoom)
+        key = (names, quantization, tolerance)
+        etag = 'W/"' + hashlib.blake2b(
+            orjson.dumps([etags, list(key)]), digest_size=16
+        ).hexdigest() + '"'
+        return layers, key, etag
+
+    def get(self, names: Sequence[str], quantization: int,
+            zoom: Optional[int] = None) -> Tuple[str, bytes, bytes]:
+        """
+        (ETag, body, gzipped body) for a combination of layers.
+
+        Raises:
+            HTTPException 400 for a quantization not in TOPOJSON_QUANTIZATION_LEVELS
+            HTTPException 404 for unknown or missing layers
+        """
+        return self._build(*self._resolve(names, quantization, zoom))
+
+    def _build(self, layers: Dict[str, Dataset], key: Tuple, etag: str) -> Tuple[str, bytes, bytes]:
+        """The cached topology for key, building it if it is missing or stale."""
+        _, quantization, tolerance = key
+        with self._lock:
+            cached = self._cache.get(key)
+            building = cached is None or cached[0] != etag
+            if building:
+                cached = self._cache[key] = (etag, Future())
+            self._cache.move_to_end(key)
+            while len(self._cache) > settings.TOPOJSON_CACHE_ENTRIES:
+                self._cache.popitem(last=False)
+        future = cached[1]
+
+        if building:
+            try:
+                body = orjson.dumps(build_topology(layers, quantization, tolerance))
+                future.set_result((etag, body, gzip.compress(body, compresslevel=settings.GEOJSON_GZIP_LEVEL)))
+            except Exception as e:
+                with self._lock:
+                    if self._cache.get(key) is cached:
+                        del self._cache[key]  # let the next request retry
+                future.set_exception(e)
+        return future.result()
+
+    def preload(self, names: Sequence[str], quantization: int):
+        """Build a topology at startup from whichever of names have files."""
+        available = tuple(name for name in names if self.registry.get(name).path.exists())
+        if available:
+            self.get(available, quantization)
+
+    def response(self, request: Request, names: Sequence[str], quantization: int,
+                 zoom: Optional[int] = None) -> Response:
+        """
+        Serve a topology with ETag revalidation and gzip when accepted.
+
+        A conditional request for the current version gets its 304 without
+        the topology being built.
+        """
+        layers, key, etag = self._resolve(names, quantization, zoom)
+        headers = {"ETag": etag, "Cache-Control": settings.DATASET_CACHE_CONTROL, "Vary": "Accept-Encoding"}
+        if is_fresh(request, etag):
+            return Response(status_code=304, headers=headers)
+        _, body, gzipped = self._build(layers, key, etag)
+        if accepts_encoding(request, "gzip"):
+            headers["Content-Encoding"] = "gzip"
+            body = gzipped
+        return Response(content=body, media_type="application/json", headers=headers)
@@ -0,0 +1,264 @@
+"""
+Dynamic Vector Tiles
+Mapbox Vector Tiles cut on demand from in-memory dataset geometries
+"""
+
+import gzip
+import math
+import threading
+from collections import OrderedDict
+from typing import Dict, Hashable, List, Optional
+import numpy as np
+import shapely
+from fastapi.responses import Response
+import settings
+from datasets import Dataset
+from spatial import BBox
+
+# MVT geometry types and commands (vector-tile-spec 2.1)
+GEOM_POINT, GEOM_LINESTRING, GEOM_POLYGON = 1, 2, 3
+CMD_MOVE_TO, CMD_LINE_TO, CMD_CLOSE_PATH = 1, 2, 7
+
+MAX_MERCATOR_LAT = 85.0511287798
+
+
+class TileCache:
+    """Thread-safe LRU of encoded tiles keyed by (z, x, y)."""
+
+    def __init__(self, max_tiles: int):
+        self.max_tiles = max_tiles
+        self._tiles = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Optional[bytes]:
+        with self._lock:
+            tile = self._tiles.get(key)
+            if tile is not None:
+                self._tiles.move_to_end(key)
+            return tile
+
+    def put(self, key: Hashable, tile: bytes):
+        with self._lock:
+            self._tiles[key] = tile
+            self._tiles.move_to_end(key)
+            while len(self._tiles) > self.max_tiles:
+                self._tiles.popitem(last=False)
+
+
+# --- Protobuf encoding -------------------------------------------------------
+
+def _varint(value: int) -> bytes:
+    out = bytearray()
+    while value > 0x7F:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+    return bytes(out)
+
+
+def _zigzag(value: int) -> int:
+    return (value << 1) ^ (value >> 63)
+
+
+def _field(number: int, wire_type: int) -> bytes:
+    return _varint((number << 3) | wire_type)
+
+
+def _message(number: int, payload: bytes) -> bytes:
+    """Length-delimited field."""
+    return _field(number, 2) + _varint(len(payload)) + payload
+
+
+def _packed(number: int, values: List[int]) -> bytes:
+    return _message(number, b"".join(_varint(v) for v in values))
+
+
+def _value(value) -> bytes:
+    """Encode a property as an MVT Value message."""
+    if isinstance(value, bool):
+        return _field(7, 0) + _varint(int(value))
+    if isinstance(value, int) and -(1 << 63) <= value < (1 << 63):
+        return _field(6, 0) + _varint(_zigzag(value))
+    if isinstance(value, float):
+        return _field(3, 1) + np.float64(value).tobytes()
+    return _message(1, str(value).encode("utf-8"))
+
+
+# --- Geometry ----------------------------------------------------------------
+
+def tile_bounds(z: int, x: int, y: int, buffer: float = 0.0) -> BBox:
+    """WGS84 bounds of an XYZ tile, widened by buffer (a fraction of the tile size)."""
+    n = 1 << z
+
+    def lon(tx):
+        return tx / n * 360.0 - 180.0
+
+    def lat(ty):
+        return math.degrees(math.atan(math.sinh(math.pi * (1 - 2 * ty / n))))
+
+    return lon(x - buffer), lat(y + 1 + buffer), lon(x + 1 + buffer), lat(y - buffer)
+
+
+def _to_tile_pixels(geometries: np.ndarray, z: int, x: int, y: int, extent: int) -> np.ndarray:
+    """Project WGS84 geometries to Web Mercator pixel coordinates of one tile."""
+    n = 1 << z
+
+    def project(coords):
+        lon = coords[:, 0]
+        lat = np.radians(np.clip(coords[:, 1], -MAX_MERCATOR_LAT, MAX_MERCATOR_LAT))
+        world_x = (lon + 180.0) / 360.0
+        world_y = (1.0 - np.arcsinh(np.tan(lat)) / np.pi) / 2.0
+        return np.column_stack([(world_x * n - x) * extent, (world_y * n - y) * extent])
+
+    return shapely.transform(geometries, project)
+
+
+def _commands(coords: np.ndarray, cursor: List[int], closed: bool) -> List[int]:
+    """MoveTo/LineTo(/ClosePath) commands for one ring or line, relative to cursor."""
+    points = coords.astype(np.int64)
+    if closed:
+        points = points[:-1]
+    # Drop repeated vertices left over from snapping to the integer grid
+    keep = np.ones(len(points), dtype=bool)
+    keep[1:] = np.any(points[1:] != points[:-1], axis=1)
+    points = points[keep]
+    if len(points) < (3 if closed else 2):
+        return []
+
+    deltas = np.diff(np.vstack([cursor, points]), axis=0)
+    cursor[:] = points[-1].tolist()
+    params = [_zigzag(int(v)) for v in deltas.ravel()]
+
+    commands = [CMD_MOVE_TO | (1 << 3), *params[:2], CMD_LINE_TO | ((len(points) - 1) << 3), *params[2:]]
+    if closed:
+        commands.append(CMD_CLOSE_PATH | (1 << 3))
+    return commands
+
+
+def _encode_geometry(geometry) -> Optional[tuple]:
+    """(MVT geometry type, command integers) for a tile-space geometry, or None if empty."""
+    cursor = [0, 0]
+    commands = []
+    kind = shapely.get_type_id(geometry)
+
+    if kind in (0, 4):  # Point, MultiPoint
+        points = shapely.get_coordinates(geometry).astype(np.int64)
+        deltas = np.diff(np.vstack([cursor, points]), axis=0)
+        commands = [CMD_MOVE_TO | (len(points) << 3), *(_zigzag(int(v)) for v in deltas.ravel())]
+        return GEOM_POINT, commands
+
+    if kind in (1, 5):  # LineString, MultiLineString
+        for part in shapely.get_parts(geometry):
+            commands += _commands(shapely.get_coordinates(part), cursor, closed=False)
+        return (GEOM_LINESTRING, commands) if commands else None
+
+    if kind in (3, 6):  # Polygon, MultiPolygon
+        # Exterior rings must have positive (surveyor's formula) area in tile coordinates
+        for part in shapely.get_parts(shapely.orient_polygons(geometry)):
+            exterior = _commands(shapely.get_coordinates(part.exterior), cursor, closed=True)
+            if not exterior:
+                continue
+            commands += exterior
+            for ring in part.interiors:
+                commands += _commands(shapely.get_coordinates(ring), cursor, closed=True)
+        return (GEOM_POLYGON, commands) if commands else None
+
+    return None
+
+
+def encode_layer(name: str, geometries: np.ndarray, properties: List[Dict],
+                 ids: np.ndarray, extent: int) -> bytes:
+    """Encode one MVT layer from tile-space geometries and their properties."""
+    keys, values = {}, {}
+    features = []
+
+    for geometry, props, feature_id in zip(geometries, properties, ids):
+        encoded = _encode_geometry(geometry)
+        if encoded is None:
+            continue
+        geom_type, commands = encoded
+
+        tags = []
+        for key, value in props.items():
+            if value is None or isinstance(value, (dict, list)):
+                continue
+            value_key = (type(value).__name__, value)
+            tags.append(keys.setdefault(key, len(keys)))
+            tags.append(values.setdefault(value_key, len(values)))
+
+        features.append(_message(2, b"".join([
+            _field(1, 0) + _varint(int(feature_id)),
+            _packed(2, tags),
+            _field(3, 0) + _varint(geom_type),
+            _packed(4, commands),
+        ])))
+
+    if not features:
+        return b""
+
+    return _message(3, b"".join([
+        _field(15, 0) + _varint(2),
+        _message(1, name.encode("utf-8")),
+        *features,
+        *(_message(3, key.encode("utf-8")) for key in keys),
+        *(_message(4, _value(value)) for _, value in values),
+        _field(5, 0) + _varint(extent),
+    ]))
+
+
+def build_tile(dataset: Dataset, layer: str, z: int, x: int, y: int) -> bytes:
+    """
+    Cut one tile: select features by bbox, project to tile pixels, clip to the
+    buffered tile, simplify by a pixel tolerance (so detail follows zoom) and
+    snap to the integer grid.
+
+    Returns:
+        Uncompressed MVT bytes (empty when no feature reaches the tile)
+    """
+    extent = settings.VECTOR_TILE_EXTENT
+    buffer = settings.VECTOR_TILE_BUFFER
+
+    index = dataset.spatial_index()
+    indices, _ = index.query(tile_bounds(z, x, y, buffer / extent))
+    if not len(indices):
+        return b""
+
+    geometries = _to_tile_pixels(index.geometries[indices], z, x, y, extent)
+    geometries = shapely.clip_by_rect(geometries, -buffer, -buffer, extent + buffer, extent + buffer)
+    geometries = shapely.simplify(geometries, settings.VECTOR_TILE_SIMPLIFY_PIXELS, preserve_topology=True)
+    geometries = shapely.set_precision(geometries, grid_size=1.0)
+
+    keep = ~shapely.is_empty(geometries) & ~shapely.is_missing(geometries)
+    properties = dataset.properties()
+    return encode_layer(
+        layer,
+        geometries[keep],
+        [properties[i] for i in indices[keep]],
+        indices[keep] + 1,  # MVT ids are unsigned; 0 reads as "no id" in most clients
+        extent,
+    )
+
+
+def tile_response(dataset: Dataset, layer: str, z: int, x: int, y: int) -> Response:
+    """
+    Serve a gzipped MVT tile for a dataset, cut on first request and then kept in
+    an LRU cache that is discarded when the dataset's file changes.
+    """
+    cache = dataset.cached(("vector_tiles",), lambda: TileCache(settings.VECTOR_TILE_CACHE_SIZE))
+    tile = cache.get((z, x, y))
+    if tile is None:
+        raw = build_tile(dataset, layer, z, x, y)
+        tile = gzip.compress(raw, compresslevel=settings.GEOJSON_GZIP_LEVEL) if raw else b""
+        cache.put((z, x, y), tile)
+
+    if not tile:
+        return Response(status_code=204)
+
+    return Response(
+        content=tile,
+        media_type="application/x-protobuf",
+        headers={
+            "Content-Encoding": "gzip",
+            "Cache-Control": f"public, max-age={settings.VECTOR_TILE_MAX_AGE}",
+        }
+    )
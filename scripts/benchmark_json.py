@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Benchmark JSON serialization of API responses
+Compares FastAPI's default path (jsonable_encoder + stdlib json) with orjson
+on the real data/tiger GeoJSON files
+"""
+
+import json
+import sys
+import time
+from pathlib import Path
+
+try:
+    import orjson
+    from fastapi.encoders import jsonable_encoder
+except ImportError:
+    print("ERROR: Missing dependencies. Install with:")
+    print("  pip install -r backend/requirements.txt")
+    sys.exit(1)
+
+TIGER_DIR = Path(__file__).parent.parent / "data" / "tiger"
+ROUNDS = 5
+
+
+def stdlib_path(content):
+    """What FastAPI does for a returned dict with the default JSONResponse."""
+    return json.dumps(
+        jsonable_encoder(content),
+        ensure_ascii=False,
+        allow_nan=False,
+        indent=None,
+        separators=(",", ":"),
+    ).encode("utf-8")
+
+
+def orjson_path(content):
+    """ORJSONResponse returned directly by the handler (no jsonable_encoder)."""
+    return orjson.dumps(content)
+
+
+def best_time(fn, content):
+    """Best-of-ROUNDS wall time in seconds."""
+    best = float("inf")
+    for _ in range(ROUNDS):
+        start = time.perf_counter()
+        fn(content)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    files = sorted(TIGER_DIR.glob("*.geojson"))
+    if not files:
+        print(f"ERROR: No GeoJSON files found in {TIGER_DIR}")
+        sys.exit(1)
+
+    print(f"{'File':<28} {'Size MB':>8} {'stdlib ms':>10} {'orjson ms':>10} {'Speedup':>8}")
+    print("-" * 68)
+
+    total_stdlib = 0.0
+    total_orjson = 0.0
+    for path in files:
+        with open(path, 'r') as f:
+            content = json.load(f)
+
+        stdlib_sec = best_time(stdlib_path, content)
+        orjson_sec = best_time(orjson_path, content)
+        total_stdlib += stdlib_sec
+        total_orjson += orjson_sec
+
+        size_mb = path.stat().st_size / (1024 * 1024)
+        print(f"{path.name:<28} {size_mb:>8.2f} {stdlib_sec * 1000:>10.1f} "
+              f"{orjson_sec * 1000:>10.1f} {stdlib_sec / orjson_sec:>7.1f}x")
+
+    print("-" * 68)
+    print(f"{'Total':<28} {'':>8} {total_stdlib * 1000:>10.1f} "
+          f"{total_orjson * 1000:>10.1f} {total_stdlib / total_orjson:>7.1f}x")
+
+
+if __name__ == '__main__':
+    main()
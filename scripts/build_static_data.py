@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Build static dataset files
+Writes each dataset's default GeoJSON view with .gz/.br sidecars to data/static,
+which the backend then streams from disk instead of holding in memory
+
+Run after the source data changes (or after changing GEOJSON_LAYER_DEFAULTS):
+
+    python scripts/build_static_data.py
+"""
+
+import gzip
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "backend"))
+
+try:
+    import orjson
+    import settings
+    from datasets import Dataset, DatasetRegistry
+except ImportError:
+    print("ERROR: Missing dependencies. Install with:")
+    print("  pip install -r backend/requirements.txt")
+    sys.exit(1)
+
+try:
+    import brotli
+except ImportError:  # .br sidecars are skipped without brotli
+    brotli = None
+
+GZIP_LEVEL = 9
+BROTLI_QUALITY = 11  # offline, so use the slowest/smallest settings
+
+
+def _write(path, data):
+    """Write atomically so a running server never streams a partial file."""
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_bytes(data)
+    tmp.replace(path)
+
+
+def build_static(dataset, output_dir):
+    """
+    Write one dataset's default view and its compressed sidecars.
+
+    Returns:
+        Manifest entry: file name and the source version/view it was built from
+    """
+    source = dataset.static_key()
+    file_name = f"{dataset.name}.{source['etag'][3:15]}.geojson"
+    body = dataset.serialized(dataset.make_view())
+
+    _write(output_dir / file_name, body)
+    sizes = [f"{len(body):,} B"]
+
+    compressed = gzip.compress(body, compresslevel=GZIP_LEVEL, mtime=0)
+    _write(output_dir / (file_name + ".gz"), compressed)
+    sizes.append(f"gzip {len(compressed):,} B")
+
+    if brotli is not None:
+        compressed = brotli.compress(body, quality=BROTLI_QUALITY)
+        _write(output_dir / (file_name + ".br"), compressed)
+        sizes.append(f"br {len(compressed):,} B")
+
+    print(f"  {dataset.name}: {file_name} ({', '.join(sizes)})")
+    return {"file": file_name, "source": source}
+
+
+def main():
+    output_dir = settings.STATIC_DATA_DIR
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    datasets = [
+        Dataset(settings.OWNERSHIP_NDJSON_PATH, "GeoJSON", "ownership"),
+        Dataset(settings.PARCELS_GEOJSON_PATH, "Parcel data", "parcels"),
+        *DatasetRegistry(settings.TIGER_DIR, settings.TIGER_LAYERS, "TIGER").datasets.values(),
+    ]
+
+    print(f"Building static datasets in {output_dir}")
+    if brotli is None:
+        print("NOTE: brotli is not installed, writing .gz sidecars only")
+
+    manifest_path = output_dir / "manifest.json"
+    try:
+        previous = orjson.loads(manifest_path.read_bytes())
+    except (FileNotFoundError, orjson.JSONDecodeError):
+        previous = {}
+
+    manifest = {}
+    for dataset in datasets:
+        if not dataset.path.exists():
+            print(f"  {dataset.name}: {dataset.path} not found, skipping")
+            continue
+        manifest[dataset.name] = build_static(dataset, output_dir)
+
+    _write(manifest_path, orjson.dumps(manifest, option=orjson.OPT_INDENT_2))
+
+    # Remove files from earlier builds. The previous build's files are kept
+    # until the next one: a running server may have read the old manifest
+    # and still be sending them.
+    keep = {entry["file"] for entry in [*manifest.values(), *previous.values()]}
+    for path in output_dir.glob("*.geojson*"):
+        if path.name.split(".geojson")[0] + ".geojson" not in keep:
+            path.unlink()
+
+    print(f"✓ Wrote {len(manifest)} datasets")
+
+
+if __name__ == "__main__":
+    main()
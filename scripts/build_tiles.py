@@ -4,12 +4,52 @@ Build MBTiles from GeoJSON - Python alternative to tippecanoe
 Simple vector tile generation for testing
 """
 
+import argparse
 import json
 import sqlite3
 import gzip
+import random
+import sys
+import tempfile
+import time
+from contextlib import contextmanager, redirect_stdout
 from pathlib import Path
 import math
 
+sys.path.insert(0, str(Path(__file__).parent.parent / "backend"))
+from production_db import normalize_api_number
+
+# Wells layer: cluster cells per tile side (caps features per tile at
+# WELLS_CLUSTER_GRID ** 2) and the zoom from which individual wells are shown
+WELLS_CLUSTER_GRID = 32
+WELLS_POINT_MINZOOM = 12
+MAX_MERCATOR_LAT = 85.0511
+
+BUILD_STAGES = ('read', 'index', 'clip', 'encode', 'compress', 'write')
+
+class BuildStats:
+    """Accumulates per-stage wall time, feature counts and tile sizes for a build."""
+
+    def __init__(self):
+        self.stage_seconds = {name: 0.0 for name in BUILD_STAGES}
+        self.features = 0
+        self.tile_sizes = {}
+
+    @contextmanager
+    def stage(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stage_seconds[name] += time.perf_counter() - start
+
+    def add_tile(self, zoom, size):
+        self.tile_sizes.setdefault(zoom, []).append(size)
+
+    @property
+    def tiles(self):
+        return sum(len(sizes) for sizes in self.tile_sizes.values())
+
 def lon_to_tile_x(lon, zoom):
     """Convert longitude to tile X coordinate."""
     return int((lon + 180.0) / 360.0 * (1 << zoom))
@@ -19,6 +59,15 @@ def lat_to_tile_y(lat, zoom):
     lat_rad = math.radians(lat)
     return int((1.0 - math.asinh(math.tan(lat_rad)) / math.pi) / 2.0 * (1 << zoom))
 
+def lon_to_world_x(lon):
+    """Convert longitude to a fractional world X coordinate (0-1)."""
+    return (lon + 180.0) / 360.0
+
+def lat_to_world_y(lat):
+    """Convert latitude to a fractional world Y coordinate (0-1, Web Mercator)."""
+    lat_rad = math.radians(max(-MAX_MERCATOR_LAT, min(MAX_MERCATOR_LAT, lat)))
+    return (1.0 - math.asinh(math.tan(lat_rad)) / math.pi) / 2.0
+
 def create_tile_feature(feature, tile_extent=4096):
     """
     Convert GeoJSON feature to a simplified vector tile feature.
@@ -26,12 +75,8 @@ def create_tile_feature(feature, tile_extent=4096):
     """
     return feature  # Simplified - just pass through for now
 
-def create_mbtiles(geojson_files, output_path, zoom_range=(4, 14)):
-    """
-    Create MBTiles from GeoJSON files.
-    This is a simplified implementation for testing.
-    """
-
+def _create_mbtiles_db(output_path, metadata):
+    """Create an empty MBTiles database (replacing any existing file) and return the connection."""
     output_path = Path(output_path)
     output_path.parent.mkdir(parents=True, exist_ok=True)
 
@@ -63,7 +108,25 @@ def create_mbtiles(geojson_files, output_path, zoom_range=(4, 14)):
     cursor.execute('CREATE UNIQUE INDEX tile_index ON tiles (zoom_level, tile_column, tile_row)')
 
     # Add metadata
-    metadata = {
+    for name, value in metadata.items():
+        cursor.execute('INSERT INTO metadata VALUES (?, ?)', (name, value))
+
+    return conn
+
+def create_mbtiles(geojson_files, output_path, zoom_range=(4, 14), stats=None):
+    """
+    Create MBTiles from GeoJSON files.
+    This is a simplified implementation for testing.
+
+    Pass a BuildStats to collect per-stage timings and tile sizes;
+    the stats object is returned either way.
+    """
+
+    output_path = Path(output_path)
+    if stats is None:
+        stats = BuildStats()
+
+    conn = _create_mbtiles_db(output_path, {
         'name': 'US Ownership',
         'format': 'pbf',
         'type': 'overlay',
@@ -73,10 +136,8 @@ def create_mbtiles(geojson_files, output_path, zoom_range=(4, 14)):
         'maxzoom': str(zoom_range[1]),
         'bounds': '-180,-85.0511,180,85.0511',
         'center': '-98.5795,39.8283,4',
-    }
-
-    for name, value in metadata.items():
-        cursor.execute('INSERT INTO metadata VALUES (?, ?)', (name, value))
+    })
+    cursor = conn.cursor()
 
     # For this simplified version, we'll create one tile per feature
     # Real tippecanoe does sophisticated spatial indexing and tiling
@@ -96,44 +157,50 @@ def create_mbtiles(geojson_files, output_path, zoom_range=(4, 14)):
         print(f"Processing {layer_name} (z{zoom_levels[0]}-{zoom_levels[1]})...")
 
         # Load features
-        features = []
-        if geojson_file.endswith('.ndjson'):
-            with open(geojson_file, 'r') as f:
-                for line in f:
-                    if line.strip():
-                        features.append(json.loads(line))
-        else:
-            with open(geojson_file, 'r') as f:
-                data = json.load(f)
-                features = data.get('features', [])
+        with stats.stage('read'):
+            features = []
+            if geojson_file.endswith('.ndjson'):
+                with open(geojson_file, 'r') as f:
+                    for line in f:
+                        if line.strip():
+                            features.append(json.loads(line))
+            else:
+                with open(geojson_file, 'r') as f:
+                    data = json.load(f)
+                    features = data.get('features', [])
+        stats.features += len(features)
 
         # Create tiles for each zoom level
         for zoom in range(zoom_levels[0], zoom_levels[1] + 1):
             # Group features by tile
-            tiles_dict = {}
+            with stats.stage('index'):
+                tiles_dict = {}
 
-            for feature in features:
-                # Get feature bounds (simplified - just use first coordinate)
-                coords = feature['geometry']['coordinates']
-                if feature['geometry']['type'] == 'Polygon':
-                    first_coord = coords[0][0]
-                else:
-                    first_coord = coords[0]
+                for feature in features:
+                    # Get feature bounds (simplified - just use first coordinate)
+                    coords = feature['geometry']['coordinates']
+                    if feature['geometry']['type'] == 'Polygon':
+                        first_coord = coords[0][0]
+                    else:
+                        first_coord = coords[0]
 
-                lon, lat = first_coord[0], first_coord[1]
+                    lon, lat = first_coord[0], first_coord[1]
 
-                # Calculate tile coordinates
-                tx = lon_to_tile_x(lon, zoom)
-                ty = lat_to_tile_y(lat, zoom)
+                    # Calculate tile coordinates
+                    tx = lon_to_tile_x(lon, zoom)
+                    ty = lat_to_tile_y(lat, zoom)
 
-                tile_key = (zoom, tx, ty)
-                if tile_key not in tiles_dict:
-                    tiles_dict[tile_key] = []
+                    tile_key = (zoom, tx, ty)
+                    if tile_key not in tiles_dict:
+                        tiles_dict[tile_key] = []
 
-                tiles_dict[tile_key].append(feature)
+                    tiles_dict[tile_key].append(feature)
 
             # Create vector tiles
             for (z, x, y), tile_features in tiles_dict.items():
+                with stats.stage('clip'):
+                    tile_features = [create_tile_feature(f) for f in tile_features]
+
                 # Create simplified vector tile (GeoJSON for now, not real MVT)
                 # Real implementation would use mapbox-vector-tile library
                 tile_data = {
@@ -142,27 +209,32 @@ def create_mbtiles(geojson_files, output_path, zoom_range=(4, 14)):
                 }
 
                 # Convert to JSON and gzip
-                tile_json = json.dumps(tile_data).encode('utf-8')
-                tile_gzipped = gzip.compress(tile_json)
+                with stats.stage('encode'):
+                    tile_json = json.dumps(tile_data).encode('utf-8')
+                with stats.stage('compress'):
+                    tile_gzipped = gzip.compress(tile_json)
 
                 # Calculate TMS y (flip y coordinate)
                 tms_y = (1 << z) - 1 - y
 
                 # Insert tile
-                try:
-                    cursor.execute(
-                        'INSERT INTO tiles (zoom_level, tile_column, tile_row, tile_data) VALUES (?, ?, ?, ?)',
-                        (z, x, tms_y, tile_gzipped)
-                    )
-                    total_tiles += 1
-                except sqlite3.IntegrityError:
-                    # Tile already exists (duplicate), skip
-                    pass
+                with stats.stage('write'):
+                    try:
+                        cursor.execute(
+                            'INSERT INTO tiles (zoom_level, tile_column, tile_row, tile_data) VALUES (?, ?, ?, ?)',
+                            (z, x, tms_y, tile_gzipped)
+                        )
+                        total_tiles += 1
+                        stats.add_tile(z, len(tile_gzipped))
+                    except sqlite3.IntegrityError:
+                        # Tile already exists (duplicate), skip
+                        pass
 
             print(f"  z{zoom}: {len(tiles_dict)} tiles")
 
-    conn.commit()
-    conn.close()
+    with stats.stage('write'):
+        conn.commit()
+        conn.close()
 
     print(f"\nCreated {output_path}")
     print(f"Total tiles: {total_tiles}")
@@ -181,7 +253,326 @@ def create_mbtiles(geojson_files, output_path, zoom_range=(4, 14)):
     print("  - Or use Docker")
     print("="*60)
 
+    return stats
+
+def load_wells(wells_geojson, db_path):
+    """
+    Load well points and join production totals from the production.db wells table.
+
+    The wells file is a GeoJSON export of the DNRC BOG wells service
+    (API_WellNo, Well_Nm, CoName, Status, Type properties).
+    Wells without imported production keep zero totals.
+    """
+    with open(wells_geojson, 'r') as f:
+        features = json.load(f).get('features', [])
+
+    production = {}
+    if Path(db_path).exists():
+        conn = sqlite3.connect(str(db_path))
+        try:
+            for api_number, oil, gas in conn.execute(
+                'SELECT api_number, total_oil_bbls, total_gas_mcf FROM wells'
+            ):
+                production[normalize_api_number(api_number)] = (oil or 0.0, gas or 0.0)
+        except sqlite3.OperationalError as e:
+            print(f"Warning: could not read wells table from {db_path}: {e}")
+        conn.close()
+    else:
+        print(f"Warning: {db_path} not found, wells will have no production totals")
+
+    wells = []
+    for feature in features:
+        geometry = feature.get('geometry') or {}
+        if geometry.get('type') != 'Point':
+            continue
+
+        lon, lat = geometry['coordinates'][:2]
+        props = feature.get('properties') or {}
+        api_number = normalize_api_number(props.get('API_WellNo'))
+        oil, gas = production.get(api_number, (0.0, 0.0))
+
+        wells.append({
+            'lon': lon,
+            'lat': lat,
+            'x': lon_to_world_x(lon),
+            'y': lat_to_world_y(lat),
+            'api_number': api_number,
+            'well_name': props.get('Well_Nm'),
+            'operator': props.get('CoName'),
+            'status': props.get('Status'),
+            'type': props.get('Type'),
+            'total_oil_bbls': oil,
+            'total_gas_mcf': gas,
+        })
+
+    return wells
+
+def cluster_wells(wells, zoom_range):
+    """
+    Hierarchical grid clustering of wells.
+
+    Clusters are computed once on the finest cluster zoom and then merged
+    into their parent cells (cell index >> 1) for each lower zoom, so every
+    cluster at zoom z is exactly the union of its children at z + 1.
+
+    Returns:
+        Dict of zoom -> {(cell_x, cell_y): [count, oil, gas, sum_lon, sum_lat]}
+    """
+    min_zoom = zoom_range[0]
+    max_cluster_zoom = min(zoom_range[1], WELLS_POINT_MINZOOM - 1)
+    if max_cluster_zoom < min_zoom:
+        return {}
+
+    scale = (1 << max_cluster_zoom) * WELLS_CLUSTER_GRID
+    cells = {}
+    for well in wells:
+        key = (int(well['x'] * scale), int(well['y'] * scale))
+        cell = cells.get(key)
+        if cell is None:
+            cell = cells[key] = [0, 0.0, 0.0, 0.0, 0.0]
+        cell[0] += 1
+        cell[1] += well['total_oil_bbls']
+        cell[2] += well['total_gas_mcf']
+        cell[3] += well['lon']
+        cell[4] += well['lat']
+
+    clusters = {max_cluster_zoom: cells}
+    for zoom in range(max_cluster_zoom - 1, min_zoom - 1, -1):
+        parents = {}
+        for (cx, cy), (count, oil, gas, sum_lon, sum_lat) in clusters[zoom + 1].items():
+            key = (cx >> 1, cy >> 1)
+            parent = parents.get(key)
+            if parent is None:
+                parent = parents[key] = [0, 0.0, 0.0, 0.0, 0.0]
+            parent[0] += count
+            parent[1] += oil
+            parent[2] += gas
+            parent[3] += sum_lon
+            parent[4] += sum_lat
+        clusters[zoom] = parents
+
+    return clusters
+
+def _insert_tile(cursor, z, x, y, tile_features):
+    """Gzip a FeatureCollection tile and insert it (TMS row) into MBTiles."""
+    tile_json = json.dumps({
+        'type': 'FeatureCollection',
+        'features': tile_features
+    }).encode('utf-8')
+    tms_y = (1 << z) - 1 - y
+    cursor.execute(
+        'INSERT INTO tiles (zoom_level, tile_column, tile_row, tile_data) VALUES (?, ?, ?, ?)',
+        (z, x, tms_y, gzip.compress(tile_json))
+    )
+
+def build_wells_mbtiles(wells_geojson, db_path, output_path, zoom_range=(4, 14)):
+    """
+    Build the wells point layer as its own MBTiles.
+
+    Below WELLS_POINT_MINZOOM each tile holds at most WELLS_CLUSTER_GRID ** 2
+    cluster points carrying point_count and summed production; individual
+    wells (with their production totals) appear from WELLS_POINT_MINZOOM up.
+    """
+    if not Path(wells_geojson).exists():
+        print(f"Warning: {wells_geojson} not found, skipping wells layer")
+        return
+
+    print(f"Processing wells (z{zoom_range[0]}-{zoom_range[1]})...")
+    wells = load_wells(wells_geojson, db_path)
+    print(f"  {len(wells)} wells loaded")
+
+    conn = _create_mbtiles_db(output_path, {
+        'name': 'Montana Wells',
+        'format': 'pbf',
+        'type': 'overlay',
+        'version': '1.0',
+        'description': 'Oil and gas wells with production totals, clustered below '
+                       f'z{WELLS_POINT_MINZOOM}',
+        'minzoom': str(zoom_range[0]),
+        'maxzoom': str(zoom_range[1]),
+        'bounds': '-116.1,44.3,-104.0,49.1',
+        'center': '-109.6,47.0,6',
+    })
+    cursor = conn.cursor()
+    total_tiles = 0
+
+    for zoom, cells in sorted(cluster_wells(wells, zoom_range).items()):
+        tiles_dict = {}
+        for (cx, cy), (count, oil, gas, sum_lon, sum_lat) in cells.items():
+            tile_key = (cx // WELLS_CLUSTER_GRID, cy // WELLS_CLUSTER_GRID)
+            tiles_dict.setdefault(tile_key, []).append({
+                'type': 'Feature',
+                'geometry': {
+                    'type': 'Point',
+                    'coordinates': [round(sum_lon / count, 6), round(sum_lat / count, 6)]
+                },
+                'properties': {
+                    'cluster': True,
+                    'point_count': count,
+                    'total_oil_bbls': round(oil, 1),
+                    'total_gas_mcf': round(gas, 1),
+                }
+            })
+
+        for (x, y), tile_features in tiles_dict.items():
+            _insert_tile(cursor, zoom, x, y, tile_features)
+        total_tiles += len(tiles_dict)
+        print(f"  z{zoom}: {len(tiles_dict)} tiles, {len(cells)} clusters")
+
+    for zoom in range(max(zoom_range[0], WELLS_POINT_MINZOOM), zoom_range[1] + 1):
+        tiles_dict = {}
+        for well in wells:
+            tile_key = (int(well['x'] * (1 << zoom)), int(well['y'] * (1 << zoom)))
+            tiles_dict.setdefault(tile_key, []).append({
+                'type': 'Feature',
+                'geometry': {'type': 'Point', 'coordinates': [well['lon'], well['lat']]},
+                'properties': {
+                    'cluster': False,
+                    'api_number': well['api_number'],
+                    'well_name': well['well_name'],
+                    'operator': well['operator'],
+                    'status': well['status'],
+                    'type': well['type'],
+                    'total_oil_bbls': well['total_oil_bbls'],
+                    'total_gas_mcf': well['total_gas_mcf'],
+                }
+            })
+
+        for (x, y), tile_features in tiles_dict.items():
+            _insert_tile(cursor, zoom, x, y, tile_features)
+        total_tiles += len(tiles_dict)
+        print(f"  z{zoom}: {len(tiles_dict)} tiles")
+
+    conn.commit()
+    conn.close()
+
+    print(f"Created {output_path} ({total_tiles} tiles)")
+
+def _percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return None
+    rank = max(1, math.ceil(pct / 100.0 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+def _peak_rss_mb():
+    """Peak resident set size of this process in MB (None where unsupported)."""
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is KB on Linux, bytes on macOS
+    divisor = 1024 * 1024 if sys.platform == 'darwin' else 1024
+    return round(peak / divisor, 1)
+
+def write_synthetic_features(path, count, seed=42):
+    """
+    Write a reproducible PAD-US-like NDJSON dataset for benchmarking:
+    irregular polygons scattered over Montana with the normalized attributes.
+    """
+    rng = random.Random(seed)
+    owner_classes = ['federal', 'state', 'local', 'tribal', 'other_public']
+
+    with open(path, 'w') as f:
+        for i in range(count):
+            cx = rng.uniform(-116.0, -104.05)
+            cy = rng.uniform(44.4, 49.0)
+            radius = rng.uniform(0.002, 0.05)
+            vertices = rng.randint(8, 64)
+            ring = []
+            for v in range(vertices):
+                angle = 2 * math.pi * v / vertices
+                r = radius * rng.uniform(0.6, 1.0)
+                ring.append([round(cx + r * math.cos(angle), 6), round(cy + r * math.sin(angle), 6)])
+            ring.append(ring[0])
+
+            owner_class = rng.choice(owner_classes)
+            f.write(json.dumps({
+                'type': 'Feature',
+                'geometry': {'type': 'Polygon', 'coordinates': [ring]},
+                'properties': {
+                    'owner_class': owner_class,
+                    'owner_name': owner_class.replace('_', ' ').title(),
+                    'unit_name': f'Unit {i}',
+                    'source': 'PAD-US 3.0',
+                    'asof': '2023-09-01',
+                }
+            }) + '\n')
+
+def run_benchmark(input_path=None, feature_count=5000, zoom_range=(4, 10), seed=42):
+    """
+    Build tiles from a fixed dataset and return a machine-readable report.
+
+    Uses input_path when given, otherwise a synthetic dataset generated from
+    seed, so runs are comparable across builder changes.
+    """
+    with tempfile.TemporaryDirectory() as tmp:
+        if input_path is None:
+            input_path = str(Path(tmp) / 'synthetic.ndjson')
+            write_synthetic_features(input_path, feature_count, seed)
+            dataset = {'synthetic': True, 'seed': seed, 'features': feature_count}
+        else:
+            dataset = {'synthetic': False, 'path': str(input_path)}
+
+        output_path = Path(tmp) / 'benchmark.mbtiles'
+        stats = BuildStats()
+        start = time.perf_counter()
+        # Keep stdout clean for the JSON report
+        with redirect_stdout(sys.stderr):
+            create_mbtiles([(str(input_path), 'benchmark', zoom_range)], output_path,
+                           zoom_range, stats=stats)
+        elapsed = time.perf_counter() - start
+        mbtiles_bytes = output_path.stat().st_size
+
+    dataset['features'] = stats.features
+    zooms = {}
+    for zoom, sizes in sorted(stats.tile_sizes.items()):
+        sizes = sorted(sizes)
+        zooms[str(zoom)] = {
+            'tiles': len(sizes),
+            'bytes': sum(sizes),
+            'p50': _percentile(sizes, 50),
+            'p90': _percentile(sizes, 90),
+            'p99': _percentile(sizes, 99),
+            'max': sizes[-1],
+        }
+
+    return {
+        'dataset': dataset,
+        'zoom_range': list(zoom_range),
+        'elapsed_sec': round(elapsed, 4),
+        'features_per_sec': round(stats.features / elapsed, 1) if elapsed else None,
+        'tiles': stats.tiles,
+        'tiles_per_sec': round(stats.tiles / elapsed, 1) if elapsed else None,
+        'peak_rss_mb': _peak_rss_mb(),
+        'mbtiles_bytes': mbtiles_bytes,
+        'stages_sec': {name: round(sec, 4) for name, sec in stats.stage_seconds.items()},
+        'zooms': zooms,
+    }
+
 if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Build ownership and wells MBTiles')
+    parser.add_argument('--benchmark', action='store_true',
+                        help='Build a fixed dataset and print a JSON throughput report')
+    parser.add_argument('--input', help='Benchmark this GeoJSON/NDJSON instead of synthetic data')
+    parser.add_argument('--features', type=int, default=5000,
+                        help='Synthetic feature count for --benchmark (default: 5000)')
+    parser.add_argument('--zooms', default='4-10',
+                        help='Zoom range for --benchmark, e.g. 4-10 (default: 4-10)')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--report', help='Also write the benchmark JSON to this file')
+    args = parser.parse_args()
+
+    if args.benchmark:
+        min_zoom, max_zoom = (int(z) for z in args.zooms.split('-'))
+        report = run_benchmark(args.input, args.features, (min_zoom, max_zoom), args.seed)
+        report_json = json.dumps(report, indent=2)
+        print(report_json)
+        if args.report:
+            Path(args.report).write_text(report_json + '\n')
+        sys.exit(0)
+
     print("Building vector tiles...")
     print()
 
@@ -194,4 +585,11 @@ if __name__ == '__main__':
 
     create_mbtiles(geojson_files, output_path)
 
+    print()
+    build_wells_mbtiles(
+        'data/wells/wells.geojson',
+        'backend/production.db',
+        'data/tiles/wells.mbtiles'
+    )
+
     print("\nNext step: cd server && uvicorn main:app --reload")
\ No newline at end of file
@@ -0,0 +1,103 @@
+"""
+Event loop lag under mixed load
+Fires cold dataset loads, topology, tiles, lookups and area queries at the app
+concurrently and fails if a 10 ms heartbeat on the event loop wakes up late.
+
+    pytest tests/test_event_loop_lag.py
+"""
+
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "backend"))
+
+httpx = pytest.importorskip("httpx")
+import main as server  # noqa: E402
+import settings  # noqa: E402
+from io_executor import io_executor  # noqa: E402
+
+HEARTBEAT_SECONDS = 0.01
+MAX_P99_LAG_SECONDS = 0.25
+ROUNDS = 3
+
+AREA = {
+    "type": "Polygon",
+    "coordinates": [[[-112.5, 45.5], [-111.0, 45.5], [-111.0, 46.5], [-112.5, 46.5], [-112.5, 45.5]]],
+}
+
+# (method, url, JSON body); non-default views so nothing is served from data/static
+REQUESTS = [
+    ("GET", "/data/tiger/blockgroups.geojson?precision=5", None),
+    ("GET", "/data/tiger/tracts_acs.geojson?zoom=8", None),
+    ("GET", "/data/ownership.geojson?fields=*&precision=5", None),
+    ("GET", "/data/ownership.geojson?format=ndjson", None),
+    ("GET", "/data/tiger/topology.json?layers=counties,tracts", None),
+    ("GET", "/api/acs/tract/geometry?zoom=6", None),
+    ("GET", "/api/acs/tract/columns?vars=median_household_income", None),
+    ("POST", "/api/query/intersects?clip=true", {"geometry": AREA, "layers": ["ownership", "tracts"]}),
+    *[("GET", f"/tiles/tiger/counties/6/{x}/22.pbf", None) for x in range(10, 14)],
+    *[("GET", f"/api/lookup?lon={-114 + i}&lat=46.5", None) for i in range(8)],
+    *[("GET", f"/api/ownership/nearest?lon={-113 + i}&lat=47&k=3", None) for i in range(4)],
+]
+
+
+async def heartbeat(lags, stop):
+    """Record how late each HEARTBEAT_SECONDS sleep wakes up."""
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(HEARTBEAT_SECONDS)
+        lags.append(time.perf_counter() - start - HEARTBEAT_SECONDS)
+
+
+def drop_caches():
+    """Forget every loaded dataset so the next round starts cold."""
+    for dataset in [server.ownership_dataset, server.parcels_dataset, *server.tiger_layers.datasets.values()]:
+        with dataset._lock:
+            dataset._signature = None
+            dataset._cache = {}
+    server.tiger_topology._cache.clear()
+
+
+async def run_round(client):
+    """Send all REQUESTS at once; returns (p99 lag in seconds, status codes)."""
+    lags, stop = [], asyncio.Event()
+    monitor = asyncio.create_task(heartbeat(lags, stop))
+    await asyncio.sleep(HEARTBEAT_SECONDS * 3)
+
+    responses = await asyncio.gather(*(
+        client.request(method, url, json=body) for method, url, body in REQUESTS
+    ))
+
+    stop.set()
+    await monitor
+    lags.sort()
+    return lags[int(len(lags) * 0.99)], {r.status_code for r in responses}
+
+
+async def mixed_load():
+    """p99 lag of each round."""
+    io_executor.start()  # as the app's startup event does
+    transport = httpx.ASGITransport(app=server.app)
+    try:
+        async with httpx.AsyncClient(transport=transport, base_url="http://test", timeout=120) as client:
+            results = []
+            for _ in range(ROUNDS):
+                drop_caches()
+                results.append(await run_round(client))
+            return results
+    finally:
+        io_executor.shutdown()
+
+
+@pytest.mark.skipif(not (settings.TIGER_DIR / settings.TIGER_LAYERS["tracts"]).exists(),
+                    reason="TIGER data not downloaded; there is no blocking work to measure")
+def test_event_loop_lag_under_mixed_load():
+    for i, (p99, statuses) in enumerate(asyncio.run(mixed_load()), 1):
+        assert statuses <= {200, 204, 404}, f"round {i}: unexpected status codes {statuses}"
+        assert p99 <= MAX_P99_LAG_SECONDS, (
+            f"round {i}: p99 event loop lag {p99 * 1000:.1f} ms exceeds {MAX_P99_LAG_SECONDS * 1000:.0f} ms"
+        )
@@ -0,0 +1,44 @@
+"""
+Feature store columns
+Properties survive the columnar round trip, including columns with no values
+"""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+import orjson
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "backend"))
+
+from feature_store import FeatureStore  # noqa: E402
+
+POINT = {"type": "Point", "coordinates": [-110.0, 46.0]}
+
+
+def _store(properties):
+    return FeatureStore(
+        orjson.dumps({"type": "Feature", "properties": p, "geometry": POINT}) for p in properties
+    )
+
+
+def test_all_null_column_round_trips():
+    properties = [{"GEOID": "30001", "median_age": None}, {"GEOID": "30003", "median_age": None}]
+    table = _store(properties).properties
+    column = table.column("median_age")
+
+    assert list(table) == properties
+    assert column.take(np.array([1, 0, -1])) == [None, None, None]
+    assert table.to_columns() == {"GEOID": ["30001", "30003"], "median_age": [None, None]}
+    values, invalid = column.to_float()
+    assert np.isnan(values).all() and invalid == 0
+    assert not column.isin(["anything"]).any()
+
+
+def test_mixed_null_and_absent_values_round_trip():
+    properties = [{"name": "a", "count": 1}, {"name": None}, {"count": 3}]
+    table = _store(properties).properties
+
+    assert list(table) == properties
+    assert table.column("name").take(np.arange(3)) == ["a", None, None]
+    assert table.column("count").take(np.arange(3)) == [1, None, 3]